@@ -0,0 +1,70 @@
+"""Compare the old iterrows create_company_column with the vectorized one on a
+BW "data download" layout (one "<column> - <company>" column per company).
+
+Usage: python -m benchmarks.bench_company_column [rows] [companies]
+The iterrows version is timed on the first 50,000 rows and scaled up, since
+it takes minutes on a full-size export.
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.multi_company_analysis import create_company_column
+
+COMPANY_COLUMN = "Tech"
+LEGACY_ROWS = 50_000
+
+
+def make_export(rows, companies):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"Full Text": [f"Mention {i}" for i in range(rows)]})
+    for i in range(companies):
+        # Most mentions name one or two companies
+        df[f"{COMPANY_COLUMN} - Company {i}"] = np.where(rng.random(rows) < 0.05, "X", None)
+    return df
+
+
+def legacy_create_company_column(df, company_column, multi_company_entry):
+    companies = [company.strip() for company in multi_company_entry.split(",")]
+    company_columns = [
+        col for col in df.columns if col.startswith(f"{company_column} - ") and col[len(company_column)+3:] in companies
+    ]
+    company_mentions = []
+    for _, row in df.iterrows():
+        mentioned_companies = [
+            col[len(company_column)+3:]
+            for col in company_columns
+            if row[col] == "X" and col[len(company_column)+3:] in companies
+        ]
+        company_mentions.append(",".join(mentioned_companies))
+    return pd.Series(company_mentions)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    companies = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    df = make_export(rows, companies)
+    entry = ", ".join(f"Company {i}" for i in range(companies))
+
+    start = time.perf_counter()
+    vectorized = create_company_column(df, COMPANY_COLUMN, entry)
+    vectorized_time = time.perf_counter() - start
+
+    sample = df.iloc[: min(rows, LEGACY_ROWS)]
+    start = time.perf_counter()
+    legacy = legacy_create_company_column(sample, COMPANY_COLUMN, entry)
+    legacy_time = (time.perf_counter() - start) * rows / len(sample)
+
+    if not legacy.equals(vectorized.iloc[: len(sample)]):
+        raise AssertionError("Vectorized result differs from the iterrows result.")
+
+    print(f"{rows:,} rows x {companies} companies")
+    print(f"iterrows (scaled from {len(sample):,} rows): {legacy_time:.1f}s")
+    print(f"vectorized:                        {vectorized_time:.2f}s")
+    print(f"speedup: {legacy_time / vectorized_time:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
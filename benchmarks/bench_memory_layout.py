@@ -0,0 +1,94 @@
+"""Peak RSS of the old object-column layout vs. the compact layout when
+loading and preparing a synthetic BW export.
+
+Usage: python -m benchmarks.bench_memory_layout [rows]
+Each layout runs in its own process so the peaks don't mix.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src import file_operations
+from src.connector_functions import get_working_frame
+
+COMPANIES = ["Apple", "Google", "Microsoft", "Amazon", "Meta", "Nvidia"]
+
+
+def make_export(rows):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Query Id": rng.integers(2_000_000_000, 2_000_000_010, rows).astype(str),
+            "Resource Id": rng.integers(10**17, 10**18, rows).astype(str),
+            "Full Text": [f"Mention number {i} about {COMPANIES[i % 6]}" for i in range(rows)],
+            "Date": "2024-12-01 10:31:00.0",
+            "Sentiment": rng.choice(["positive", "neutral", "negative"], rows),
+            "Tech": [",".join(COMPANIES[: i % 4 + 1]) for i in range(rows)],
+            "AnalyzedCompany": rng.choice(COMPANIES, rows),
+            "Author": [f"author_{i % 5000}" for i in range(rows)],
+            "Url": [f"https://example.com/post/{i}" for i in range(rows)],
+        }
+    )
+
+
+def peak_rss_mb():
+    try:
+        import psutil  # Windows: peak working set
+
+        memory = psutil.Process().memory_info()
+        if hasattr(memory, "peak_wset"):
+            return memory.peak_wset / 2**20
+    except ImportError:
+        pass
+    # Linux: VmHWM, unlike ru_maxrss, isn't inherited from the parent across exec
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 2**10
+    raise RuntimeError("Peak RSS isn't available on this platform.")
+
+
+def run_layout(layout, input_file):
+    if layout == "object":
+        # What the pipeline used to do: object columns and full-width copies
+        df = pd.read_csv(input_file)
+        df["Probs"] = ""
+        cols = df.columns.tolist()
+        sentiment_index = cols.index("Sentiment")
+        df = df[cols[: sentiment_index + 1] + ["Probs"] + cols[sentiment_index + 1 : -1]]
+        working = df.sample(frac=1, random_state=42).reset_index(drop=True)
+        bw = df.copy()
+    else:
+        df = file_operations.read_file(input_file, lambda message: None, company_column="Tech")
+        df.insert(df.columns.get_loc("Sentiment") + 1, "Probs", np.nan)
+        file_operations.compact_columns(df, "Tech")
+        df["AnalyzedCompany"] = df["AnalyzedCompany"].astype("category")
+        working = get_working_frame(df)
+        bw = df[[c for c in ["Query Id", "Resource Id", "Sentiment", "Date"]]].copy()
+    frame_mb = df.memory_usage(deep=True).sum() / 2**20
+    print(f"{layout:>7}: DataFrame {frame_mb:,.0f} MB, peak RSS {peak_rss_mb():,.0f} MB")
+    return working, bw
+
+
+def main():
+    if len(sys.argv) > 2:
+        run_layout(sys.argv[2], sys.argv[3])
+        return
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{rows:,} rows")
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, "export.csv")
+        make_export(rows).to_csv(input_file, index=False)
+        for layout in ["object", "compact"]:
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_memory_layout", str(rows), layout, input_file],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Compare the old groupby/iterrows merge_separate_company_results with the
+vectorized one, and check they produce the same tags.
+
+Usage: python -m benchmarks.bench_merge_company_results [mentions]
+The old version is timed on the first 20,000 mentions and scaled up, since
+it takes minutes on a full-size run.
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.multi_company_analysis import MENTION_ROW_COLUMN, merge_separate_company_results
+
+COMPANIES = [f"Company {i}" for i in range(30)]
+LEGACY_MENTIONS = 20_000
+
+
+def make_results(mentions):
+    """Mentions plus classified (mention, company) pairs, ~2 companies each."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "Query Id": rng.integers(2_000_000_000, 2_000_000_010, mentions).astype(str),
+            "Resource Id": rng.integers(10**17, 10**18, mentions).astype(str),
+            "Full Text": [f"Mention {i}" for i in range(mentions)],
+            "Sentiment": "",
+            "Author": [f"author_{i % 5000}" for i in range(mentions)],
+        }
+    )
+    company_counts = rng.choice([0, 1, 2, 3, 4], mentions, p=[0.1, 0.35, 0.3, 0.15, 0.1])
+    rows = np.repeat(np.arange(mentions), np.maximum(company_counts, 1))
+    companies = np.array([""] * len(rows), dtype=object)
+    has_company = np.repeat(company_counts > 0, np.maximum(company_counts, 1))
+    companies[has_company] = rng.choice(COMPANIES, has_company.sum())
+    company_pairs = pd.DataFrame(
+        {
+            MENTION_ROW_COLUMN: rows,
+            "AnalyzedCompany": pd.Categorical(companies),
+            "Full Text": df["Full Text"].take(rows).to_numpy(),
+            "Sentiment": pd.Categorical(rng.choice(["Positive", "Neutral", "Negative"], len(rows))),
+        }
+    )
+    return df, company_pairs
+
+
+def legacy_merge_separate_company_results(df, bw_upload=False):
+    grouped = df.groupby("OriginalIndex")
+
+    merged_rows = []
+    for _, group in grouped:
+        merged_row = group.iloc[0].copy()  # Take the first row as the base
+
+        primary_sentiment = merged_row["Sentiment"]
+        primary_company = merged_row["AnalyzedCompany"]
+
+        if bw_upload:
+            tags = [
+                f"{row['Sentiment']} toward {row['AnalyzedCompany']}"
+                for _, row in group.iterrows()
+                if row["AnalyzedCompany"]
+            ]
+            merged_row["BW_Tags"] = ",".join(tags)
+        else:
+            sentiments = [
+                f"{row['Sentiment']} toward {row['AnalyzedCompany']}"
+                for _, row in group.iterrows()
+                if row["AnalyzedCompany"]
+            ]
+            merged_row["Combined_Sentiment"] = " | ".join(sentiments)
+
+        merged_row["Sentiment"] = primary_sentiment
+        merged_row["AnalyzedCompany"] = primary_company
+        merged_rows.append(merged_row)
+
+    result_df = pd.DataFrame(merged_rows)
+    result_df.set_index("OriginalIndex", inplace=True)
+    result_df.sort_index(inplace=True)
+    return result_df
+
+
+def expand(df, company_pairs):
+    """The wide expanded frame the old merge worked on."""
+    expanded = df.iloc[company_pairs[MENTION_ROW_COLUMN].to_numpy()].copy()
+    expanded["Sentiment"] = company_pairs["Sentiment"].to_numpy()
+    expanded["AnalyzedCompany"] = company_pairs["AnalyzedCompany"].to_numpy()
+    expanded["OriginalIndex"] = expanded.index
+    return expanded.reset_index(drop=True)
+
+
+def main():
+    mentions = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    df, company_pairs = make_results(mentions)
+    print(f"{mentions:,} mentions, {len(company_pairs):,} mention-company pairs")
+
+    for bw_upload, column in [(True, "BW_Tags"), (False, "Combined_Sentiment")]:
+        start = time.perf_counter()
+        merged = merge_separate_company_results(df, company_pairs, bw_upload)
+        vectorized_time = time.perf_counter() - start
+
+        sample = min(mentions, LEGACY_MENTIONS)
+        sample_pairs = company_pairs[company_pairs[MENTION_ROW_COLUMN] < sample]
+        expanded = expand(df, sample_pairs)
+        start = time.perf_counter()
+        legacy = legacy_merge_separate_company_results(expanded, bw_upload)
+        legacy_time = (time.perf_counter() - start) * mentions / sample
+
+        for check in [column, "Sentiment"]:
+            if legacy[check].astype(str).tolist() != merged[check].iloc[:sample].astype(str).tolist():
+                raise AssertionError(f"Vectorized {check} differs from the old merge.")
+
+        print(f"{column}:")
+        print(f"  groupby/iterrows (scaled from {sample:,} mentions): {legacy_time:.1f}s")
+        print(f"  vectorized:                                   {vectorized_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
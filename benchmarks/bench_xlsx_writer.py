@@ -0,0 +1,56 @@
+"""Compare pandas' openpyxl-based to_excel with file_operations.write_excel_file.
+
+Usage: python -m benchmarks.bench_xlsx_writer [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src import file_operations
+
+
+def make_export(rows):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Query Id": rng.integers(1_000_000, 2_000_000, rows),
+            "Resource Id": rng.integers(10**17, 10**18, rows),
+            "Date": pd.Timestamp("2024-12-01") + pd.to_timedelta(rng.integers(0, 86400 * 30, rows), unit="s"),
+            "Full Text": [f"Mention {i} about https://example.com/{i} and =SUM(A1)" for i in range(rows)],
+            "Author": [f"author_{i % 5000}" for i in range(rows)],
+            "Sentiment": rng.choice(["Positive", "Neutral", "Negative"], rows),
+            "Probs": rng.random(rows),
+        }
+    )
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    df = make_export(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        df.to_excel(os.path.join(tmp, "openpyxl.xlsx"), index=False, engine="openpyxl")
+        openpyxl_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        file_operations.write_excel_file(df, os.path.join(tmp, "xlsxwriter.xlsx"), print)
+        streaming_time = time.perf_counter() - start
+
+        # Separate run, as tracing allocations slows the writer down
+        tracemalloc.start()
+        file_operations.write_excel_file(df, os.path.join(tmp, "xlsxwriter.xlsx"), print)
+        streaming_peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+
+    print(f"{rows} rows")
+    print(f"pandas to_excel (openpyxl):         {openpyxl_time:.1f}s")
+    print(f"write_excel_file (constant_memory): {streaming_time:.1f}s, peak {streaming_peak:,.0f} MB allocated")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 import os
 import sys
+import multiprocessing
+import threading
 import tkinter as tk
 from tkinter import filedialog
 import tkinter.font as tkFont
@@ -186,6 +188,10 @@ class SentimentAnalysisApp:
         self.separate_company_tags_checkbox_var = tk.IntVar()
 
         self.logprob_checkbox_var = tk.IntVar()
+        self.results_only_checkbox_var = tk.IntVar()
+        self.bw_changed_only_checkbox_var = tk.IntVar()
+        self.combined_company_requests_checkbox_var = tk.IntVar()
+        self.company_context_checkbox_var = tk.IntVar()
         self.temperature_var = tk.DoubleVar(value=0.3)
         self.max_tokens_var = tk.DoubleVar(value=1)
         self.dual_model_var = tk.BooleanVar(value=False)
@@ -377,6 +383,24 @@ class SentimentAnalysisApp:
             font=("Segoe UI", 11),
             wrap=tk.WORD,
         )
+        company_aliases_label = tk.Label(
+            self.multi_company_frame,
+            text="Company aliases (optional):",
+            font=("Segoe UI", 12),
+        )
+        ToolTip(
+            company_aliases_label,
+            text="Other names to look for when only sending the text around each company (Advanced Options), e.g. “Meta: Facebook, Instagram; Google: Alphabet”.",
+            wraplength=500,
+            delay=100,
+        )
+        self.company_aliases_entry = tk.Text(
+            self.multi_company_frame,
+            width=55,
+            height=2,
+            font=("Segoe UI", 11),
+            wrap=tk.WORD,
+        )
         separate_company_tags_checkbox = ttk.Checkbutton(
             self.multi_company_frame,
             variable=self.separate_company_tags_checkbox_var,
@@ -394,6 +418,8 @@ class SentimentAnalysisApp:
         self.company_column_entry.pack(pady=(1, 0))
         multi_company_label.pack(pady=(8, 0))
         self.multi_company_entry.pack(pady=(1, 0))
+        company_aliases_label.pack(pady=(8, 0))
+        self.company_aliases_entry.pack(pady=(1, 0))
         separate_company_tags_checkbox.pack(side=tk.LEFT, pady=(15, 0))
 
     def create_custom_prompt_section(self):
@@ -599,6 +625,62 @@ class SentimentAnalysisApp:
         )
         self.logprob_checkbox.pack(pady=(15, 0))
 
+        self.results_only_checkbox = ttk.Checkbutton(
+            advanced_options,
+            text=" Output result columns only",
+            variable=self.results_only_checkbox_var,
+            style="Roundtoggle.Toolbutton",
+        )
+        self.results_only_checkbox.pack(pady=(15, 0))
+        ToolTip(
+            self.results_only_checkbox,
+            text="Only write the ID and result columns (Sentiment, Probs, etc.) to the output file, which is much faster for large exports. They can be merged back into the original export later with `python -m src.join_results`.",
+            wraplength=500,
+            delay=100,
+        )
+
+        self.bw_changed_only_checkbox = ttk.Checkbutton(
+            advanced_options,
+            text=" Only upload changed sentiment to Brandwatch",
+            variable=self.bw_changed_only_checkbox_var,
+            style="Roundtoggle.Toolbutton",
+        )
+        self.bw_changed_only_checkbox.pack(pady=(15, 0))
+        ToolTip(
+            self.bw_changed_only_checkbox,
+            text="Compare the new sentiment with the sentiment already in the Brandwatch export and only upload mentions that changed or aren't checked yet. Saves Brandwatch API calls when re-classifying.",
+            wraplength=500,
+            delay=100,
+        )
+
+        self.combined_company_requests_checkbox = ttk.Checkbutton(
+            advanced_options,
+            text=" One request per mention for all companies",
+            variable=self.combined_company_requests_checkbox_var,
+            style="Roundtoggle.Toolbutton",
+        )
+        self.combined_company_requests_checkbox.pack(pady=(15, 0))
+        ToolTip(
+            self.combined_company_requests_checkbox,
+            text="With separate sentiment tags for each company (Multi-Company), ask for the sentiment toward all companies a post mentions in one request instead of one request per company. Companies the model doesn't answer for are retried one at a time. Probabilities aren't available for combined answers.",
+            wraplength=500,
+            delay=100,
+        )
+
+        self.company_context_checkbox = ttk.Checkbutton(
+            advanced_options,
+            text=" Only send the text around each company",
+            variable=self.company_context_checkbox_var,
+            style="Roundtoggle.Toolbutton",
+        )
+        self.company_context_checkbox.pack(pady=(15, 0))
+        ToolTip(
+            self.company_context_checkbox,
+            text="Multi-Company: for long posts (over 1,000 characters), only send the sentences around each mention of the analyzed company (or its aliases) to the model instead of the whole text. Saves tokens on long articles; posts that never name the company are sent whole. The output file keeps the full text.",
+            wraplength=500,
+            delay=100,
+        )
+
         # temperature slider
         self.temperature_label = tk.Label(
             advanced_options, text="Temperature: 0.3", font=("Segoe UI", 12)
@@ -761,11 +843,12 @@ class SentimentAnalysisApp:
     # GUI EVENT HANDLING FUNCTIONS
     def browse_input_file(self):
         file_path = filedialog.askopenfilename(
-            title="Select an Input File (Excel, CSV, or Zip containing a CSV)",
+            title="Select an Input File (Excel, CSV, Zip containing a CSV, Parquet, or Feather)",
             filetypes=[
-                ("All Compatible Files", "*.xlsx *.csv *.zip"),
+                ("All Compatible Files", "*.xlsx *.csv *.zip *.parquet *.feather"),
                 ("Excel Files", "*.xlsx"),
                 ("CSV Files", "*.csv"),
+                ("Parquet/Feather Files", "*.parquet *.feather"),
                 ("Zip Files", "*.zip"),
             ],
         )
@@ -775,7 +858,12 @@ class SentimentAnalysisApp:
     def browse_output_file(self):
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV Files", "*.csv"), ("Excel Files", "*.xlsx")],
+            filetypes=[
+                ("CSV Files", "*.csv"),
+                ("Excel Files", "*.xlsx"),
+                ("Parquet Files", "*.parquet"),
+                ("Feather Files", "*.feather"),
+            ],
         )
         self.output_entry.delete(0, tk.END)
         self.output_entry.insert(0, file_path)
@@ -873,6 +961,10 @@ class SentimentAnalysisApp:
         """Reset all advanced options to their default values."""
         # Reset variables to defaults
         self.logprob_checkbox_var.set(0)
+        self.results_only_checkbox_var.set(0)
+        self.bw_changed_only_checkbox_var.set(0)
+        self.combined_company_requests_checkbox_var.set(0)
+        self.company_context_checkbox_var.set(0)
         self.temperature_var.set(0.3)
         self.max_tokens_var.set(1)
         self.dual_model_var.set(False)
@@ -896,12 +988,19 @@ class SentimentAnalysisApp:
             user_prompt2=self.user_prompt_entry2.get(),
             model_display_name=self.model_display_name_var.get().strip(),
             update_brandwatch=bool(self.bw_checkbox_var.get()),
+            bw_changed_only=bool(self.bw_changed_only_checkbox_var.get()),
             output_probabilities=bool(self.logprob_checkbox_var.get()),
+            results_only_output=bool(self.results_only_checkbox_var.get()),
             company_column=self.company_column_entry.get(),
             multi_company_entry=self.multi_company_entry.get("1.0", tk.END),
             separate_company_analysis=bool(
                 self.separate_company_tags_checkbox_var.get()
             ),
+            combined_company_requests=bool(
+                self.combined_company_requests_checkbox_var.get()
+            ),
+            company_context_only=bool(self.company_context_checkbox_var.get()),
+            company_aliases=self.company_aliases_entry.get("1.0", tk.END),
             temperature=float(self.temperature_scale.get()),
             max_tokens=int(self.max_tokens_scale.get()),
             use_dual_models=bool(self.dual_model_var.get()),
@@ -931,11 +1030,16 @@ class SentimentAnalysisApp:
         )
 
     def start_metrics_analysis(self):
-        metrics.analyze_api_metrics(
-            log_message=self.log_message,
-            enable_button=self.enable_button,
-            disable_button=self.disable_button,
-        )
+        # Off the Tk thread so the window stays responsive
+        threading.Thread(
+            target=metrics.analyze_api_metrics,
+            kwargs=dict(
+                log_message=self.log_message,
+                enable_button=self.enable_button,
+                disable_button=self.disable_button,
+            ),
+            daemon=True,
+        ).start()
 
     def setup_progress_bar(self, placeholder_frame, progress_var):
         if not hasattr(placeholder_frame, "progress_bar"):
@@ -980,6 +1084,7 @@ class SentimentAnalysisApp:
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # multi-file inputs are parsed in worker processes
     enable_high_dpi_awareness()
     root = tk.Tk()
     app = SentimentAnalysisApp(root)
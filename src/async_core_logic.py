@@ -1,24 +1,41 @@
 import asyncio
+import json
 import math
 import time
 
 from aiohttp import ClientSession
+import numpy as np
+import pandas as pd
 
+from . import metrics
 from .token_counting import calculate_token_count
 from .model_router import get_model_config
+from .file_operations import set_labels
+from .multi_company_analysis import MENTION_ROW_COLUMN, focus_company_context
 
 RATE_LIMIT_DELAY = 30  # seconds
 
+# Combined company requests (see call_company_sentiments)
+COMPANY_RESPONSE_TOKENS = 16  # completion tokens allowed per company
+COMPANY_SENTIMENT_LABELS = ["Positive", "Neutral", "Negative"]
+
 # Asynchronously processes tweets in batches (based on token counts)
 async def batch_processing_handler(
     config,
     df,
     update_progress_gui,
     log_message,
+    on_results=None,
 ):
+    # on_results(index, sentiments), if given, is called as each batch's
+    # results are stored (used to stream them to Brandwatch)
+    if config.company_context_only and config.customization_option == "Multi-Company":
+        focus_company_context(config, df, log_message)
     await calculate_token_count(config, df, log_message)
 
     progress_scale = 60 if config.update_brandwatch else 90
+    model_config = get_model_config(config.model_name)
+    run_metrics = metrics.ModelRunMetrics(model_config["provider"], config.model_name)
 
     async with ClientSession() as session:
         update_progress_gui(5)  # initial progress for progress bar
@@ -31,6 +48,8 @@ async def batch_processing_handler(
             session,
             is_reprocessing=False,
             progress_scale=progress_scale,
+            on_results=on_results,
+            run_metrics=run_metrics,
         )
 
         # Reprocess errored tweets
@@ -49,6 +68,8 @@ async def batch_processing_handler(
                 session,
                 is_reprocessing=True,
                 progress_scale=progress_scale,
+                on_results=on_results,
+                run_metrics=run_metrics,
             )
 
             # Check for remaining errors
@@ -57,6 +78,9 @@ async def batch_processing_handler(
                 log_message(
                     f"Still error processing {len(errored_df)} mentions. Contact Milo if persistent."
                 )
+
+    run_metrics.finish(len(df))
+    log_message(run_metrics.describe())
     return df, start_time
 
 
@@ -69,6 +93,8 @@ async def process_batches(
     session,
     is_reprocessing=False,
     progress_scale=60,
+    on_results=None,
+    run_metrics=None,
 ):
     total = len(working_df)
     processed = 0
@@ -76,7 +102,11 @@ async def process_batches(
 
     while start_idx < len(working_df):
         batch_end_idx = calculate_batch_size(
-            working_df, config.batch_token_limit, config.batch_requests_limit, start_idx
+            working_df,
+            config.batch_token_limit,
+            config.batch_requests_limit,
+            start_idx,
+            config.combined_company_requests and MENTION_ROW_COLUMN in working_df.columns,
         )
 
         # Different message based on processing type
@@ -93,26 +123,32 @@ async def process_batches(
             
         model_config = get_model_config(config.model_name)
         
-        if config.customization_option == "Multi-Company":
+        # (batch positions, coroutine) per request; a combined company request
+        # returns one result per position
+        if config.combined_company_requests and MENTION_ROW_COLUMN in batch.columns:
+            tasks = get_company_request_tasks(config, model_config, session, batch, run_metrics)
+        elif config.customization_option == "Multi-Company":
             tasks = [
-                (i, call_model_api(config, model_config, session, tweet, company))
+                ([i], call_model_api(config, model_config, session, tweet, company, run_metrics=run_metrics))
                 for i, (tweet, company) in enumerate(
                     zip(batch["Full Text"], batch["AnalyzedCompany"])
                 )
             ]
         else:
             tasks = [
-                (i, call_model_api(config, model_config, session, tweet))
+                ([i], call_model_api(config, model_config, session, tweet, run_metrics=run_metrics))
                 for i, tweet in enumerate(batch["Full Text"])
             ]
 
         # Create tasks and track their futures
         futures_map = {}
-        batch_results = [None] * len(tasks)
+        batch_results = [None] * len(batch)
 
-        for idx, coro in tasks:
+        for positions, coro in tasks:
             future = asyncio.create_task(coro)
-            futures_map[future] = idx
+            futures_map[future] = positions
+        if run_metrics is not None:
+            run_metrics.set_queue_depth(len(futures_map), total - processed)
 
         # Process results as they complete
         pending = set(futures_map.keys())
@@ -122,21 +158,26 @@ async def process_batches(
             )
 
             for future in done:
-                idx = futures_map[future]
+                positions = futures_map[future]
                 try:
                     result = await future
-                    batch_results[idx] = result
+                    results = result if len(positions) > 1 else [result]
                 except Exception as e:
-                    batch_results[idx] = e
+                    results = [e] * len(positions)
+                for idx, result in zip(positions, results):
+                    batch_results[idx] = result
 
-                processed += 1
+                processed += len(positions)
                 progress = (processed / total) * progress_scale
                 update_progress_gui(progress + 5)  # +5 from initial setup
 
+            if run_metrics is not None:
+                run_metrics.set_queue_depth(len(pending), total - processed)
+
         timer = asyncio.create_task(asyncio.sleep(RATE_LIMIT_DELAY))
         start_time = time.time()
 
-        handle_batch_results(config, df, log_message, batch, batch_results)
+        handle_batch_results(config, df, log_message, batch, batch_results, on_results)
 
         # Different progress message based on processing type
         if is_reprocessing:
@@ -152,7 +193,80 @@ async def process_batches(
 
     return start_time
 
-async def call_model_api(config, model_config: dict, session: ClientSession, tweet: str, company: str = None, max_retries=6):
+def get_company_request_tasks(config, model_config, session, batch, run_metrics=None):
+    # Pairs of the same mention (see multi_company_analysis.get_company_pairs)
+    # that have a company share one request; the rest are sent one by one
+    texts = batch["Full Text"].tolist()
+    companies = batch["AnalyzedCompany"].astype(str).tolist()
+    mention_positions = {}
+    tasks = []
+    for i, (row, company) in enumerate(zip(batch[MENTION_ROW_COLUMN].tolist(), companies)):
+        if company:
+            mention_positions.setdefault(row, []).append(i)
+        else:
+            tasks.append(([i], call_model_api(config, model_config, session, texts[i], company, run_metrics=run_metrics)))
+    for positions in mention_positions.values():
+        if len(positions) == 1:
+            i = positions[0]
+            coro = call_model_api(config, model_config, session, texts[i], companies[i], run_metrics=run_metrics)
+        else:
+            coro = call_company_sentiments(
+                config, model_config, session, texts[positions[0]],
+                [companies[i] for i in positions], run_metrics=run_metrics,
+            )
+        tasks.append((positions, coro))
+    return tasks
+
+
+async def call_company_sentiments(config, model_config: dict, session: ClientSession, tweet: str, companies: list, max_retries=6, run_metrics=None):
+    # One request for the sentiment toward every company; companies the
+    # response has no valid label for fall back to a call of their own
+    system_prompt = config.company_list_prompt.format(
+        companies=", ".join(f'"{company}"' for company in companies)
+    )
+    payload = model_config["create_payload"](
+        config,
+        system_prompt,
+        tweet,
+        max_tokens=COMPANY_RESPONSE_TOKENS * len(companies) + 10,
+        json_response=True,
+    )
+    result = await post_model_request(model_config, session, payload, max_retries, run_metrics)
+    sentiments = parse_company_sentiments(result[0], companies) if result is not None else {}
+    if config.output_probabilities:
+        sentiments = {company: (sentiment, None) for company, sentiment in sentiments.items()}
+
+    missing = list(dict.fromkeys(company for company in companies if company not in sentiments))
+    if missing:
+        fallback = await asyncio.gather(*[
+            call_model_api(config, model_config, session, tweet, company, max_retries, run_metrics)
+            for company in missing
+        ])
+        sentiments.update(zip(missing, fallback))
+    return [sentiments[company] for company in companies]
+
+
+def parse_company_sentiments(text: str, companies: list) -> dict:
+    # Valid {company: label} entries of a combined response; anything that
+    # can't be parsed or matched to a requested company is left out
+    text = text.strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+    try:
+        response = json.loads(text)
+    except ValueError:
+        return {}
+    if not isinstance(response, dict):
+        return {}
+
+    labels = {str(key).strip().lower(): value for key, value in response.items()}
+    sentiments = {}
+    for company in companies:
+        label = labels.get(company.lower())
+        if isinstance(label, str) and label.strip().capitalize() in COMPANY_SENTIMENT_LABELS:
+            sentiments[company] = label.strip().capitalize()
+    return sentiments
+
+
+async def call_model_api(config, model_config: dict, session: ClientSession, tweet: str, company: str = None, max_retries=6, run_metrics=None):
     if config.customization_option == "Multi-Company":
         toward_company = f" toward {company}" if company else ""
         system_prompt = config.system_prompt.format(toward_company=toward_company)
@@ -160,7 +274,18 @@ async def call_model_api(config, model_config: dict, session: ClientSession, twe
         system_prompt = config.system_prompt
 
     payload = model_config["create_payload"](config, system_prompt, tweet)
-    
+    result = await post_model_request(model_config, session, payload, max_retries, run_metrics)
+    if result is None:
+        return "Error"
+    sentiment, logprob = result
+    return (sentiment, logprob) if config.output_probabilities else sentiment
+
+
+async def post_model_request(model_config: dict, session: ClientSession, payload: dict, max_retries=6, run_metrics=None):
+    # Parsed (text, logprob) of the response, or None once retries run out
+    start_time = time.time()
+    http_status = None
+    rate_limited = 0  # attempts answered with a 429
     retry_delay = 1
     for attempt in range(max_retries):
         try:
@@ -170,49 +295,93 @@ async def call_model_api(config, model_config: dict, session: ClientSession, twe
                 headers=model_config["headers"],
                 params=model_config["params"]
             ) as response:
+                http_status = response.status
+                rate_limited += response.status == 429
                 if response.status == 200:
                     result = await response.json()
                     sentiment, logprob = model_config["parse_response"](result)
-                    return (sentiment, logprob) if config.output_probabilities else sentiment
+                    record_model_request(
+                        run_metrics, model_config, "success", http_status,
+                        attempt + 1, rate_limited, start_time, result,
+                    )
+                    return sentiment, logprob
                 elif attempt < max_retries - 1:
                     await asyncio.sleep(retry_delay)
                     retry_delay += 2
                 else:
-                    return "Error"
+                    record_model_request(
+                        run_metrics, model_config, "http_error", http_status,
+                        attempt + 1, rate_limited, start_time,
+                    )
+                    return None
         except Exception as e:
             print(f"Error calling model API: {e}")
             if attempt < max_retries - 1:
                 await asyncio.sleep(retry_delay)
                 retry_delay += 2
             else:
-                return "Error"
+                record_model_request(
+                    run_metrics, model_config, "error", http_status,
+                    attempt + 1, rate_limited, start_time,
+                )
+                return None
+
+
+def record_model_request(
+    run_metrics, model_config, status, http_status, attempts, rate_limited, start_time, result=None
+):
+    if run_metrics is None:
+        return
+    prompt_tokens, completion_tokens = (
+        model_config["parse_usage"](result) if result is not None else (0, 0)
+    )
+    run_metrics.record(
+        status,
+        time.time() - start_time,
+        attempts,
+        http_status,
+        rate_limited,
+        prompt_tokens,
+        completion_tokens,
+    )
 
 
-def handle_batch_results(config, df, log_message, batch, results):
+def handle_batch_results(config, df, log_message, batch, results, on_results=None):
+    # Collect the batch's results and assign them in one go per column
+    result_index, sentiments, probs = [], [], []
     for tweet_idx, result in zip(batch.index, results):
         if isinstance(result, Exception):
             log_message(f"Error processing text at row {tweet_idx}: {result}")
+            continue
+        if config.output_probabilities and isinstance(result, tuple):
+            sentiment, logprob = result  # unpack the tuple
+            probs.append(math.exp(logprob) if logprob is not None else math.nan)
         else:
-            if config.output_probabilities:
-                sentiment, logprob = result  # unpack the tuple
-                df.at[tweet_idx, "Sentiment"] = sentiment
-                prob = math.exp(logprob)
-                df.at[tweet_idx, "Probs"] = prob
-            else:
-                sentiment = result
-                df.at[tweet_idx, "Sentiment"] = sentiment
-
-
-def calculate_batch_size(df, batch_token_limit, batch_requests_limit, start_idx):
-    batch_token_count = 0
-    batch_end_idx = start_idx
-    while (
-        batch_end_idx < len(df) and (batch_end_idx - start_idx) < batch_requests_limit
-    ):
-        tweet_token_count = df.iloc[batch_end_idx]["Token Count"]
-        if batch_token_count + tweet_token_count <= batch_token_limit:
-            batch_token_count += tweet_token_count
-            batch_end_idx += 1
-        else:
-            break
-    return batch_end_idx
+            sentiment = result  # "Error" comes back without a logprob
+            probs.append(math.nan)
+        result_index.append(tweet_idx)
+        sentiments.append(sentiment)
+
+    if result_index:
+        set_labels(df, "Sentiment", result_index, sentiments)
+        if config.output_probabilities:
+            df.loc[result_index, "Probs"] = probs
+        if on_results is not None:
+            on_results(result_index, sentiments)
+
+
+def calculate_batch_size(
+    df, batch_token_limit, batch_requests_limit, start_idx, combined_requests=False
+):
+    # Largest prefix (up to the request limit) whose cumulative tokens fit the limit
+    window = slice(start_idx, start_idx + batch_requests_limit)
+    token_counts = df["Token Count"].to_numpy()[window]
+    if combined_requests:
+        # Company pairs of a combined request share one request per batch
+        # (whichever batch the mention's first pair landed in), so only the
+        # first pair in the window is counted
+        repeated = pd.Series(df[MENTION_ROW_COLUMN].to_numpy()[window]).duplicated().to_numpy()
+        token_counts = np.where(repeated, 0, token_counts)
+    fits = np.searchsorted(np.cumsum(token_counts), batch_token_limit, side="right")
+    # Always take at least one mention so an oversized one can't stall the loop
+    return start_idx + max(int(fits), 1) if len(token_counts) else start_idx
@@ -1,14 +1,25 @@
 import asyncio
+import gzip
 import json
 import time
-from typing import List
+from collections import deque
+from dataclasses import dataclass
 from enum import Enum
 
 import aiohttp
+import numpy as np
 import pandas as pd
 import socket
+import threading
+
+try:
+    import orjson
+except ImportError:  # optional: faster request encoding, falls back to json
+    orjson = None
 
 from . import metrics
+from .bw_upload_journal import BWUploadJournal
+from .metrics_exporter import metrics_exporter
 from .sa_secrets.keys import BW_API_KEY, PROJECT_ID
 
 URL = f"https://api.brandwatch.com/projects/{PROJECT_ID}/data/mentions"
@@ -17,14 +28,32 @@ TRANSIENT_ERROR_CODES = [502, 503, 504, 408]
 MAX_RETRIES = 5
 MAX_RATE_LIMIT_WAIT_TIME = 600  # 10 minutes in seconds
 BATCH_SIZE = 1360
+MIN_BATCH_SIZE = 85  # BATCH_SIZE / 16
 TIMEOUT_ERROR_CODE = 100
 
 MAX_CONCURRENT_REQUESTS = 5
 
+# Brandwatch allows 30 calls per rolling 10 minutes
+BW_CALLS_PER_WINDOW = 30
+BW_RATE_LIMIT_WINDOW = 600  # 10 minutes in seconds
+TRANSIENT_RETRY_DELAY = 5
+
+# Only columns read by prepare_data_for_bw (for loading upload-only files)
+BW_COLUMNS = ["Query Id", "Resource Id", "Sentiment", "Date", "BW_Tags"]
+
 TCP_CONNECTOR_LIMIT = 100
 CONNECT_TIMEOUT = 30
 TOTAL_TIMEOUT = 60
 
+# Send request bodies gzip-compressed (Content-Encoding: gzip)
+GZIP_REQUEST_BODIES = False
+GZIP_LEVEL = 5
+
+# Adaptive chunk sizing (see BWChunkSizer)
+SLOW_RESPONSE_TIME = TOTAL_TIMEOUT / 2
+CHUNK_SHRINK_FACTOR = 0.75
+CHUNK_GROWTH_FACTOR = 1.25
+
 
 class BWError(Enum):
     SUCCESS = "SUCCESS"
@@ -35,152 +64,375 @@ class BWError(Enum):
     DUPLICATE_TAG = "DUPLICATE_TAG"  # Duplicate tag error - retry without tags
 
 
-def update_bw_sentiment(df: pd.DataFrame, update_progress_gui, log_message) -> None:
-    asyncio.run(async_update_bw_sentiment(df, update_progress_gui, log_message))
+@dataclass(frozen=True)
+class BWPayload:
+    """Encoded request body for one chunk, with its mention count."""
+    body: bytes
+    count: int
+    gzipped: bool = False
 
 
-async def async_update_bw_sentiment(
-    df: pd.DataFrame, update_progress_gui, log_message
+def update_bw_sentiment(
+    df: pd.DataFrame, update_progress_gui, log_message, bw_state=None
 ) -> None:
-    cleaned_sentiment_dicts = prepare_data_for_bw(df, log_message)
-    chunks = [
-        json.dumps(cleaned_sentiment_dicts[i : i + BATCH_SIZE])
-        for i in range(0, len(cleaned_sentiment_dicts), BATCH_SIZE)
-    ]
-
-    total_sent = 0
-    chunk_index = 0
-    backoff_time = 60  # Start with 1 minute backoff
-
-    # Modified ClientSession creation with TCP settings
-    connector = aiohttp.TCPConnector(
-        limit=TCP_CONNECTOR_LIMIT,
-        force_close=True,
-        enable_cleanup_closed=True
-    )
-    timeout = aiohttp.ClientTimeout(
-        connect=CONNECT_TIMEOUT,
-        total=TOTAL_TIMEOUT
+    asyncio.run(
+        async_update_bw_sentiment(df, update_progress_gui, log_message, bw_state)
     )
-    
-    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-        while chunk_index < len(chunks):
-            remaining_chunks = len(chunks) - chunk_index
-            chunk_group_size = min(MAX_CONCURRENT_REQUESTS, remaining_chunks)
-            current_chunks = chunks[chunk_index : chunk_index + chunk_group_size]
 
+
+async def async_update_bw_sentiment(
+    df: pd.DataFrame, update_progress_gui, log_message, bw_state=None
+) -> None:
+    mentions = prepare_data_for_bw(df, log_message)
+    rows = np.arange(len(mentions))
+    if bw_state is not None:
+        rows = get_changed_rows(mentions, rows, bw_state)
+        if len(rows) < len(mentions):
+            metrics_exporter.inc("sa_bw_mentions_skipped_total", len(mentions) - len(rows), reason="unchanged")
             log_message(
-                f"Sending batches {chunk_index + 1} to {chunk_index + chunk_group_size} of {len(chunks)} to Brandwatch..."
+                f"Skipping {len(mentions) - len(rows)} mentions whose sentiment is unchanged and already checked in Brandwatch."
             )
 
+    journal = BWUploadJournal(mentions.column("queryId"))
+    total = len(rows)
+    rows = journal.unacknowledged(mentions, rows)
+    if len(rows) < total:
+        metrics_exporter.inc("sa_bw_mentions_skipped_total", total - len(rows), reason="journal")
+        log_message(
+            f"Skipping {total - len(rows)} mentions already updated by an earlier run of this upload."
+        )
+
+    uploader = BWUploader(mentions, update_progress_gui, log_message, journal)
+    uploader.add(rows)
+    uploader.close()
+    await uploader.run()
+
+
+class BWUploader:
+    """Sends queued mentions to Brandwatch in chunks, keeping up to
+    MAX_CONCURRENT_REQUESTS requests running within the rate limit.
+
+    Mentions can keep being added while run() is going; only full chunks
+    are sent until close() is called, then the rest is flushed.
+    Acknowledged chunks are recorded in the journal, if given."""
+
+    def __init__(self, mentions, update_progress_gui, log_message, journal=None):
+        self.mentions = mentions
+        self.update_progress_gui = update_progress_gui
+        self.log_message = log_message
+        self.journal = journal
+
+        # Row positions of mentions waiting to be sent, and requests currently
+        # running (task -> (chunk, start time)). Chunks are cut from the front
+        # of the queue at send time so their size can follow chunk_sizer.
+        self.pending = deque()
+        self.in_flight = {}
+        self.chunk_sizer = BWChunkSizer()
+        self.wakeup = asyncio.Event()
+        self.closed = False
+        self.cancelled = False
+
+        self.queued = 0
+        self.total_sent = 0
+        self.batch_number = 0
+        self.backoff_time = 60  # Start with 1 minute backoff
+        self.consecutive_failures = 0
+
+    def add(self, rows) -> None:
+        self.pending.extend(rows)
+        self.queued += len(rows)
+        self.wakeup.set()
+
+    def close(self, cancel=False) -> None:
+        self.closed = True
+        self.cancelled = cancel
+        self.wakeup.set()
+
+    def chunk_ready(self) -> bool:
+        return bool(self.pending) and (
+            self.closed or len(self.pending) >= self.chunk_sizer.size
+        )
+
+    async def run(self) -> None:
+        # Modified ClientSession creation with TCP settings
+        connector = aiohttp.TCPConnector(
+            limit=TCP_CONNECTOR_LIMIT,
+            force_close=True,
+            enable_cleanup_closed=True
+        )
+        timeout = aiohttp.ClientTimeout(
+            connect=CONNECT_TIMEOUT,
+            total=TOTAL_TIMEOUT
+        )
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
             try:
-                processed_count, failed_chunks, needs_backoff = await process_chunk_group(
-                    current_chunks, session, log_message
-                )
-
-                num_successes = len(current_chunks) - len(failed_chunks)
-                
-                if failed_chunks:
-                    if needs_backoff:
-                        # Rate limit hit - implement exponential backoff
-                        backoff_time = min(backoff_time * 2, MAX_RATE_LIMIT_WAIT_TIME)
-                        log_message(f"Rate limit reached. Backing off for {backoff_time/60:.1f} minutes...")
-                        await asyncio.sleep(backoff_time)
-                    elif processed_count == 0:
-                        # All chunks failed with transient errors - small delay and retry
-                        log_message("All requests failed. Retrying after short delay...")
-                        await asyncio.sleep(5)
-                    
-                    # Replace remaining chunks with failed ones
-                    chunks[chunk_index + num_successes : chunk_index + chunk_group_size] = failed_chunks
-                    
-                    if processed_count > 0:
-                        # If we had some successes, reset backoff
-                        backoff_time = 60
-                        total_sent += processed_count
-                        log_message(
-                            f"Progress: Updated {total_sent} of {len(cleaned_sentiment_dicts)} mentions in Brandwatch."
+                while not self.cancelled and (
+                    self.pending or self.in_flight or not self.closed
+                ):
+                    self.dispatch(session)
+
+                    quota_wait = bw_rate_limiter.wait_time() if self.chunk_ready() else 0
+                    if not self.in_flight and quota_wait:
+                        self.log_message(
+                            f"Waiting {quota_wait:.0f} secs for the Brandwatch rate limit before the next batch..."
                         )
-                        progress = (total_sent / len(cleaned_sentiment_dicts)) * 30  # 30% range for BW
-                        update_progress_gui(65 + progress)
-
-                    # Only advance by number of successful chunks
-                    chunk_index += num_successes
-
-                else:
-                    # All chunks succeeded
-                    total_sent += processed_count
-                    backoff_time = 60  # Reset backoff time
-                    log_message(
-                        f"Progress: Updated {total_sent} of {len(cleaned_sentiment_dicts)} mentions in Brandwatch."
+                        await asyncio.sleep(quota_wait)
+                        continue
+
+                    # Wake up when a request finishes or new mentions are added
+                    wakeup = asyncio.create_task(self.wakeup.wait())
+                    done, _ = await asyncio.wait(
+                        [*self.in_flight, wakeup],
+                        timeout=quota_wait or None,
+                        return_when=asyncio.FIRST_COMPLETED,
                     )
-                    progress = (total_sent / len(cleaned_sentiment_dicts)) * 30  # 30% range for BW
-                    update_progress_gui(65 + progress)
-                    chunk_index += chunk_group_size
+                    if wakeup in done:
+                        self.wakeup.clear()
+                    else:
+                        wakeup.cancel()
+
+                    # Record every finished chunk before giving up on an error
+                    errors = []
+                    for task in done:
+                        if task in self.in_flight:
+                            try:
+                                self.handle_result(task)
+                            except Exception as e:
+                                errors.append(e)
+                    if errors:
+                        raise errors[0]
+                    self.export_queue_depth()
 
             except Exception as e:
-                log_message(f"Unexpected error processing chunk group: {str(e)}")
-                break
-
-
-async def process_chunk_group(
-    chunks: List[str],
-    session: aiohttp.ClientSession,
-    log_message
-) -> tuple[int, List[str], bool]:
-    """Process a group of chunks in parallel
-    Returns: (successful_count, failed_chunks, needs_backoff)"""
-    tasks = [
-        async_bw_request(session, chunk) for chunk in chunks
-    ]
-    results = await asyncio.gather(*tasks)
-
-    successful_count = 0
-    failed_chunks = []
-    needs_backoff = False
-
-    for chunk, (error_type, count) in zip(chunks, results):
+                self.log_message(f"Unexpected error sending chunks to Brandwatch: {str(e)}")
+            finally:
+                for task in self.in_flight:
+                    task.cancel()
+                metrics_exporter.set("sa_bw_queue_depth", len(self.pending))
+                metrics_exporter.set("sa_bw_requests_in_flight", 0)
+                metrics_exporter.flush()
+
+        unsent = len(self.pending) + sum(len(chunk) for chunk, _ in self.in_flight.values())
+        if unsent and self.journal is not None:
+            self.log_message(
+                f"{unsent} mentions were not updated in Brandwatch. Uploading the same file again will continue where this upload stopped."
+            )
+
+    def export_queue_depth(self) -> None:
+        metrics_exporter.set("sa_bw_queue_depth", len(self.pending))
+        metrics_exporter.set("sa_bw_requests_in_flight", len(self.in_flight))
+
+    def dispatch(self, session) -> None:
+        # Start the next chunk as soon as a slot is free and the quota allows it
+        while (
+            self.chunk_ready()
+            and len(self.in_flight) < MAX_CONCURRENT_REQUESTS
+            and bw_rate_limiter.wait_time() == 0
+        ):
+            size = min(self.chunk_sizer.size, len(self.pending))
+            chunk = [self.pending.popleft() for _ in range(size)]
+            self.batch_number += 1
+            self.log_message(
+                f"Sending batch {self.batch_number} ({len(chunk)} mentions, {len(self.pending)} remaining) to Brandwatch..."
+            )
+            bw_rate_limiter.record_call()
+            task = asyncio.create_task(
+                async_bw_request(session, self.mentions.encode(chunk))
+            )
+            self.in_flight[task] = (chunk, time.monotonic())
+        self.export_queue_depth()
+
+    def handle_result(self, task) -> None:
+        chunk, start_time = self.in_flight[task]
+        error_type, count = task.result()
+        del self.in_flight[task]
+
         if error_type == BWError.SUCCESS:
-            successful_count += count
+            if self.journal is not None:
+                self.journal.record(self.mentions, chunk)
+            self.chunk_sizer.record_success(len(chunk), time.monotonic() - start_time)
+            self.total_sent += count
+            metrics_exporter.inc("sa_bw_mentions_uploaded_total", count)
+            self.backoff_time = 60  # Reset backoff time
+            self.consecutive_failures = 0
+            self.log_message(
+                f"Progress: Updated {self.total_sent} of {self.queued} mentions in Brandwatch."
+            )
+            if self.update_progress_gui is not None:
+                progress = (self.total_sent / self.queued) * 30  # 30% range for BW
+                self.update_progress_gui(65 + progress)
         elif error_type == BWError.RATE_LIMIT:
-            needs_backoff = True
-            failed_chunks.append(chunk)
+            # Quota used up elsewhere - hold all new requests back
+            self.backoff_time = min(self.backoff_time * 2, MAX_RATE_LIMIT_WAIT_TIME)
+            self.log_message(f"Rate limit reached. Backing off for {self.backoff_time/60:.1f} minutes...")
+            bw_rate_limiter.pause(self.backoff_time)
+            self.pending.extendleft(reversed(chunk))
         elif error_type in (BWError.TRANSIENT, BWError.TIMEOUT):
-            failed_chunks.append(chunk)
+            if error_type == BWError.TIMEOUT:
+                # Bisect: the next chunk is cut from this one at half its size
+                if self.chunk_sizer.record_timeout(len(chunk)):
+                    self.log_message(
+                        f"Brandwatch timed out. Reducing batch size to {self.chunk_sizer.size} mentions..."
+                    )
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= MAX_CONCURRENT_REQUESTS:
+                self.log_message("Several requests failed in a row. Retrying after short delay...")
+                bw_rate_limiter.pause(TRANSIENT_RETRY_DELAY)
+                self.consecutive_failures = 0
+            self.pending.extendleft(reversed(chunk))
         elif error_type == BWError.DUPLICATE_TAG:
             # Log message and retry without tags
-            log_message("Duplicate tag error detected. Retrying chunk without tags...")
-            chunk_data = json.loads(chunk)
-            for item in chunk_data:
-                item.pop("addTag", None)  # Remove addTag field
-            failed_chunks.append(json.dumps(chunk_data))
+            self.log_message("Duplicate tag error detected. Retrying chunk without tags...")
+            self.mentions.drop_tags(chunk)  # Remove addTag field
+            self.pending.extendleft(reversed(chunk))
         # PERMANENT errors are dropped
+        if error_type not in (BWError.SUCCESS, BWError.PERMANENT):
+            metrics_exporter.inc("sa_bw_retries_total")
+
+
+class BWUploadPipeline:
+    """Uploads sentiment to Brandwatch from a background thread while
+    classification is still running.
+
+    Mentions are queued with add_results() as batches finish, so full chunks
+    go out during classification instead of after the output is written.
+    With bw_state (see get_bw_state), only changed mentions are queued."""
+
+    def __init__(self, df: pd.DataFrame, log_message, bw_state=None):
+        # Upload columns for every row; sentiment is filled in as results arrive
+        self.index = df.index
+        self.mentions = BWMentions(*get_upload_columns(df, np.ones(len(df), dtype=bool)))
+        self.journal = BWUploadJournal(self.mentions.column("queryId"))
+        self.bw_state = bw_state
+        self.unchanged = 0
+        self.skipped = 0
+        self.log_message = log_message
+        # Progress bar stays with classification; upload progress is logged
+        self.uploader = BWUploader(self.mentions, None, log_message, self.journal)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_until_complete, args=(self.uploader.run(),), daemon=True
+        )
+        self.thread.start()
+
+    def add_results(self, index, sentiments) -> None:
+        sentiment = pd.Series(sentiments, dtype="string").str.lower()
+        valid = sentiment.isin(["positive", "negative", "neutral"]).to_numpy(dtype=bool)
+        if not valid.any():
+            return
+        rows = self.index.get_indexer(pd.Index(index)[valid])
+        self.mentions.set_column("sentiment", rows, sentiment[valid].to_numpy(dtype=object))
+        if self.bw_state is not None:
+            changed = get_changed_rows(self.mentions, rows, self.bw_state)
+            self.unchanged += len(rows) - len(changed)
+            metrics_exporter.inc("sa_bw_mentions_skipped_total", len(rows) - len(changed), reason="unchanged")
+            rows = changed
+        unacknowledged = self.journal.unacknowledged(self.mentions, rows)
+        self.skipped += len(rows) - len(unacknowledged)
+        metrics_exporter.inc("sa_bw_mentions_skipped_total", len(rows) - len(unacknowledged), reason="journal")
+        self.loop.call_soon_threadsafe(self.uploader.add, unacknowledged.tolist())
+
+    def finish(self, cancel=False) -> None:
+        """Flush the remaining mentions (or stop, if cancel) and wait for the upload."""
+        if self.unchanged:
+            self.log_message(
+                f"Skipped {self.unchanged} mentions whose sentiment is unchanged and already checked in Brandwatch."
+            )
+        if self.skipped:
+            self.log_message(
+                f"Skipped {self.skipped} mentions already updated by an earlier run of this upload."
+            )
+        self.loop.call_soon_threadsafe(self.uploader.close, cancel)
+        self.thread.join()
+        self.loop.close()
+
+
+class BWRateLimiter:
+    """Client-side view of the Brandwatch quota (calls per rolling window),
+    so requests wait for a free slot instead of running into 429s.
+
+    One module-level instance is shared by every upload in the session."""
+
+    def __init__(self, max_calls=BW_CALLS_PER_WINDOW, window=BW_RATE_LIMIT_WINDOW):
+        self.max_calls = max_calls
+        self.window = window
+        self.call_times = deque()
+        self.blocked_until = 0.0
+
+    def wait_time(self) -> float:
+        """Seconds until another call is allowed (0 if one can be sent now)."""
+        now = time.monotonic()
+        while self.call_times and self.call_times[0] <= now - self.window:
+            self.call_times.popleft()
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if len(self.call_times) >= self.max_calls:
+            return self.call_times[0] + self.window - now
+        return 0
+
+    def record_call(self) -> None:
+        self.call_times.append(time.monotonic())
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all calls for the given time (after a 429 or repeated failures)."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+bw_rate_limiter = BWRateLimiter()
 
-    return successful_count, failed_chunks, needs_backoff
+
+class BWChunkSizer:
+    """Working chunk size for Brandwatch uploads.
+
+    Halved when a chunk times out (so a timed-out chunk is retried as two
+    halves), trimmed when responses get slow, and grown back toward
+    BATCH_SIZE after fast successes. Results for chunks sent before the
+    last change (larger or smaller than the current size) are ignored, so
+    requests that were already running don't adjust it twice."""
+
+    def __init__(self):
+        self.size = BATCH_SIZE
+
+    def record_timeout(self, chunk_size: int) -> bool:
+        """Returns True if the working size was reduced."""
+        if chunk_size > self.size or self.size == MIN_BATCH_SIZE:
+            return False
+        self.size = max(MIN_BATCH_SIZE, chunk_size // 2)
+        return True
+
+    def record_success(self, chunk_size: int, response_time: float) -> None:
+        if chunk_size != self.size:
+            return
+        if response_time > SLOW_RESPONSE_TIME:
+            self.size = max(MIN_BATCH_SIZE, int(self.size * CHUNK_SHRINK_FACTOR))
+        else:
+            self.size = min(BATCH_SIZE, int(self.size * CHUNK_GROWTH_FACTOR))
 
 
 async def async_bw_request(
-    session: aiohttp.ClientSession, data: str
+    session: aiohttp.ClientSession, payload: BWPayload
 ) -> tuple[BWError, int]:
-    await asyncio.sleep(0.5)
     start_time = time.time()
     headers = {
         "Authorization": f"Bearer {BW_API_KEY}",
         "Content-type": "application/json",
     }
+    if payload.gzipped:
+        headers["Content-Encoding"] = "gzip"
 
     try:
-        async with session.patch(URL, data=data, headers=headers) as response:
+        async with session.patch(URL, data=payload.body, headers=headers) as response:
             http_response_time = time.time() - start_time
             print(f"HTTP response time: {http_response_time:.2f}s")
             
             # Handle HTTP-level errors first
             if response.status == 429:
-                metrics.log_api_response("rate_limit", http_response_time, http_response_time, response.status, data)
+                metrics.log_api_response("rate_limit", http_response_time, http_response_time, response.status, payload.count)
                 return BWError.RATE_LIMIT, 0
             
             if response.status in TRANSIENT_ERROR_CODES:
-                metrics.log_api_response("transient", http_response_time, http_response_time, response.status, data)
+                metrics.log_api_response("transient", http_response_time, http_response_time, response.status, payload.count)
                 return BWError.TRANSIENT, 0
 
             # Try to parse response
@@ -189,7 +441,7 @@ async def async_bw_request(
             except json.JSONDecodeError as e:
                 total_response_time = time.time() - start_time
                 print(f"Failed to parse response. Total response time: {total_response_time:.2f}s")
-                metrics.log_api_response("read_error", http_response_time, total_response_time, response.status, data=data, error=e)
+                metrics.log_api_response("read_error", http_response_time, total_response_time, response.status, batch_size=payload.count, error=e)
                 return BWError.TRANSIENT, 0
             total_response_time = time.time() - start_time
             
@@ -197,92 +449,169 @@ async def async_bw_request(
             if "errors" in response_json and response_json["errors"]:
                 for error in response_json["errors"]:
                     if error.get("code") == TIMEOUT_ERROR_CODE:
-                        metrics.log_api_response("timeout", http_response_time, total_response_time, response.status, data)
+                        metrics.log_api_response("timeout", http_response_time, total_response_time, response.status, payload.count)
                         return BWError.TIMEOUT, 0
                     
                     # Check for duplicate tag error
                     if error.get("code") == 201 and "Tag with that name already exists" in error.get("message", ""):
-                        metrics.log_api_response("duplicate_tag", http_response_time, total_response_time, response.status, data)
+                        metrics.log_api_response("duplicate_tag", http_response_time, total_response_time, response.status, payload.count)
                         return BWError.DUPLICATE_TAG, 0
 
-                metrics.log_api_response("api_error", http_response_time, total_response_time, response.status, data, error=response_json["errors"])
+                metrics.log_api_response("api_error", http_response_time, total_response_time, response.status, payload.count, error=response_json["errors"])
                 return BWError.PERMANENT, 0
             print(f"Total response time: {total_response_time:.2f}s")
-            metrics.log_api_response("success", http_response_time, total_response_time, response.status, data=data)
-            return BWError.SUCCESS, len(json.loads(data))
+            metrics.log_api_response("success", http_response_time, total_response_time, response.status, batch_size=payload.count)
+            return BWError.SUCCESS, payload.count
 
     except asyncio.TimeoutError as e:
         total_response_time = time.time() - start_time
         print(f"Request timed out. Total response time: {total_response_time:.2f}s")
-        metrics.log_api_response("timeout", http_response_time=0, total_response_time=total_response_time, data=data, error=e)
+        metrics.log_api_response("timeout", http_response_time=0, total_response_time=total_response_time, batch_size=payload.count, error=e)
         return BWError.TIMEOUT, 0
     except (socket.gaierror, ConnectionError, aiohttp.ClientOSError) as e:
         total_response_time = time.time() - start_time
         print(f"Connection error: {str(e)}. Total response time: {total_response_time:.2f}s")
-        metrics.log_api_response("connection_error", http_response_time=0, total_response_time=total_response_time, data=data, error=e)
+        metrics.log_api_response("connection_error", http_response_time=0, total_response_time=total_response_time, batch_size=payload.count, error=e)
         return BWError.TRANSIENT, 0
     except Exception as e:
         total_response_time = time.time() - start_time
         print(f"Failed to send request. Total response time: {total_response_time:.2f}s")
-        metrics.log_api_response("connection_error", http_response_time=0, total_response_time=total_response_time, data=data, error=e)
+        metrics.log_api_response("connection_error", http_response_time=0, total_response_time=total_response_time, batch_size=payload.count, error=e)
         return BWError.TRANSIENT, 0
 
 
 def prepare_data_for_bw(df, log_message):
-    df_bw = df.copy()
-    df_bw["Sentiment"] = df_bw["Sentiment"].str.lower()
+    sentiment = df["Sentiment"].astype("string").str.lower()
 
     # remove invalid sentiment values
-    df_bw = df_bw[df_bw["Sentiment"].isin(["positive", "negative", "neutral"])]
-    if len(df) != len(df_bw):
-        removed_mentions = len(df) - len(df_bw)
+    valid = sentiment.isin(["positive", "negative", "neutral"]).to_numpy(dtype=bool)
+    if not valid.all():
+        removed_mentions = len(df) - int(valid.sum())
         log_message(
             f"Removed {removed_mentions} mentions with invalid sentiment values before uploading to Brandwatch."
         )
 
-    if "BW_Tags" in df_bw.columns:
+    if "BW_Tags" in df.columns:
         log_message(
             "Adding sentiment tags to company mentions before uploading to Brandwatch..."
         )
-        df_bw["addTag"] = df_bw["BW_Tags"].apply(
-            lambda x: x.split(",") if pd.notna(x) and x else []
+
+    return BWMentions(*get_upload_columns(df, valid, sentiment))
+
+
+def get_upload_columns(df, valid, sentiment=None):
+    """Upload fields (by BW API name) and tags for the rows in the valid mask.
+    Without sentiment, the sentiment field is left empty to be set later."""
+    # Only the upload columns are taken, not the whole export
+    columns = {
+        "queryId": get_id_values(df["Query Id"][valid]),
+        "resourceId": get_id_values(df["Resource Id"][valid]),
+        "sentiment": (
+            sentiment[valid]
+            if sentiment is not None
+            else pd.Series(None, index=df.index[valid], dtype=object)
+        ),
+    }
+    if "Date" in df.columns:
+        columns["date"] = (
+            pd.to_datetime(df["Date"][valid]).dt.strftime("%Y-%m-%dT%H:%M:%S.%f") + "+0000"
         )
-        df_bw = df_bw.drop(columns=["BW_Tags"])
 
-    if "Date" in df_bw.columns:
-        df_bw["Date"] = (
-            pd.to_datetime(df_bw["Date"]).dt.strftime("%Y-%m-%dT%H:%M:%S.%f") + "+0000"
+    tags = None
+    if "BW_Tags" in df.columns:
+        tags = df["BW_Tags"][valid].astype("string").fillna("")
+
+    return columns, tags
+
+
+def get_id_values(ids: pd.Series) -> pd.Series:
+    # Ids are kept as text; numeric ones are sent as numbers, as before
+    numbers = pd.to_numeric(ids, errors="coerce")
+    if numbers.notna().all() and pd.api.types.is_integer_dtype(numbers):
+        return numbers
+    return ids
+
+
+def get_bw_state(df: pd.DataFrame):
+    """Sentiment and checked state the export had in Brandwatch, to compare
+    new labels against. None if the file has no Sentiment column."""
+    if "Sentiment" not in df.columns:
+        return None
+    if "Checked" in df.columns:
+        checked = df["Checked"].astype("string").str.lower().isin(["true", "1", "yes"])
+    else:
+        # Nothing to go on, so only compare sentiment
+        checked = pd.Series(True, index=df.index)
+    return pd.DataFrame(
+        {
+            "sentiment": df["Sentiment"].astype("string").str.lower().fillna(""),
+            "checked": checked.to_numpy(dtype=bool),
+        },
+        index=df.index,
+    )
+
+
+def get_changed_rows(mentions, rows, bw_state) -> np.ndarray:
+    """The rows whose new sentiment differs from bw_state, that aren't checked
+    in Brandwatch yet, or that add tags (tags aren't part of the export)."""
+    rows = np.asarray(rows, dtype=np.intp)
+    previous = bw_state.reindex(mentions.index[rows])
+    changed = (
+        previous["sentiment"].fillna("").to_numpy(dtype=object)
+        != mentions.column("sentiment")[rows]
+    )
+    changed |= ~previous["checked"].fillna(False).to_numpy(dtype=bool)
+    changed |= mentions.has_tags[rows]
+    return rows[changed]
+
+
+class BWMentions:
+    """Upload columns for the mentions going to Brandwatch.
+
+    Chunks are referenced by row position and only turned into a request
+    body when they are sent, so nothing is serialized up front."""
+
+    def __init__(self, columns: dict, tags: pd.Series = None):
+        # Row labels in the analyzed DataFrame
+        self.index = next(iter(columns.values())).index
+        self.names = list(columns)
+        self.columns = [column.to_numpy(dtype=object) for column in columns.values()]
+        self.tags = tags.to_numpy(dtype=object) if tags is not None else None
+        self.has_tags = (
+            tags.str.len().gt(0).to_numpy(dtype=bool)
+            if tags is not None
+            else np.zeros(len(self), dtype=bool)
         )
 
-    df_bw["Checked"] = "true"
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
 
-    return create_dict_list(df_bw)
+    def column(self, name) -> np.ndarray:
+        return self.columns[self.names.index(name)]
 
+    def set_column(self, name, rows, values) -> None:
+        self.columns[self.names.index(name)][rows] = values
 
-def create_dict_list(df_bw):
-    base_columns = ["Query Id", "Resource Id", "Sentiment", "Checked"]
+    def drop_tags(self, rows) -> None:
+        self.has_tags[rows] = False
 
-    if "Date" in df_bw.columns:
-        base_columns.append("Date")
+    def encode(self, rows) -> BWPayload:
+        rows = np.asarray(rows)
+        records = [
+            dict(zip(self.names, values), checked="true")
+            for values in zip(*(column[rows].tolist() for column in self.columns))
+        ]
+        # Add 'addTag' to mentions that have tags
+        for i in np.flatnonzero(self.has_tags[rows]):
+            records[i]["addTag"] = self.tags[rows[i]].split(",")
 
-    sentiment_dicts = (
-        df_bw[base_columns]
-        .rename(
-            columns={
-                "Query Id": "queryId",
-                "Resource Id": "resourceId",
-                "Sentiment": "sentiment",
-                "Date": "date",
-                "Checked": "checked",
-            }
-        )
-        .to_dict("records")
-    )
+        body = encode_json(records)
+        if GZIP_REQUEST_BODIES:
+            return BWPayload(gzip.compress(body, GZIP_LEVEL), len(records), gzipped=True)
+        return BWPayload(body, len(records))
 
-    # Add 'addTag' to dictionaries where it exists and is not empty
-    if "addTag" in df_bw.columns:
-        for i, row in df_bw.iterrows():
-            if row["addTag"]:
-                sentiment_dicts[i]["addTag"] = row["addTag"]
 
-    return sentiment_dicts
+def encode_json(records) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(records)
+    return json.dumps(records, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,126 @@
+import csv
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from .metrics import get_local_data_dir
+
+JOURNAL_DIR = "bw_upload_journals"
+JOURNAL_MAX_AGE_DAYS = 30
+JOURNAL_COLUMNS = ["queryId", "resourceId", "sentiment", "tags"]
+
+
+def get_journal_dir(journal_dir=JOURNAL_DIR):
+    # Per user and machine, not in the synced app folder
+    return os.path.join(get_local_data_dir(), journal_dir)
+
+
+def get_journal_path(journal_dir, query_id) -> str:
+    name = re.sub(r"[^\w-]", "_", query_id)
+    return os.path.join(journal_dir, f"bw_upload_{name}.csv")
+
+
+def make_keys(query_ids, resource_ids, sentiments, tags) -> pd.Index:
+    return pd.Index(
+        query_ids + "\t" + resource_ids + "\t" + sentiments + "\t" + tags
+    )
+
+
+class BWUploadJournal:
+    """Append-only record of the mentions Brandwatch has acknowledged, so an
+    interrupted upload resumes without re-sending (and spending quota on)
+    what already landed.
+
+    Entries are kept in one file per Brandwatch query and looked up by
+    mention, so resuming works whichever rows the uploaded file still has
+    (e.g. the output file, after invalid rows were dropped). A mention only
+    counts as done if it was sent with the same sentiment and tags, so a
+    re-classified file is still uploaded in full."""
+
+    def __init__(self, query_ids):
+        self.journal_dir = get_journal_dir()
+        os.makedirs(self.journal_dir, exist_ok=True)
+        prune_journals(self.journal_dir)
+        query_ids = pd.unique(pd.Series(query_ids, dtype=object).dropna().astype(str))
+        self.acknowledged = self.load(query_ids)
+
+    def load(self, query_ids) -> pd.Index:
+        keys = [pd.Index([], dtype=object)]
+        for query_id in query_ids:
+            path = get_journal_path(self.journal_dir, query_id)
+            if not os.path.exists(path):
+                continue
+            try:
+                # A crash mid-write can leave a partial last line
+                journal = pd.read_csv(
+                    path, dtype=str, keep_default_na=False, on_bad_lines="skip"
+                )
+                keys.append(make_keys(*(journal[column] for column in JOURNAL_COLUMNS)))
+            except Exception as e:
+                print(f"Error reading upload journal {path}: {e}")
+        return keys[0].append(keys[1:])
+
+    def unacknowledged(self, mentions, rows) -> np.ndarray:
+        """The rows (positions in mentions) not yet acknowledged by Brandwatch."""
+        rows = np.asarray(rows, dtype=np.intp)
+        if not len(self.acknowledged) or not len(rows):
+            return rows
+        keys = make_keys(*get_journal_values(mentions, rows))
+        return rows[~keys.isin(self.acknowledged)]
+
+    def record(self, mentions, rows) -> None:
+        """Append acknowledged rows and flush them to disk straight away."""
+        values = pd.DataFrame(dict(zip(JOURNAL_COLUMNS, get_journal_values(mentions, rows))))
+        for query_id, entries in values.groupby("queryId", sort=False):
+            path = get_journal_path(self.journal_dir, query_id)
+            try:
+                new_file = not os.path.exists(path)
+                with open(path, "a+", newline="", encoding="utf-8") as f:
+                    if not new_file and needs_newline(f):
+                        f.write("\n")
+                    writer = csv.writer(f)
+                    if new_file:
+                        writer.writerow(JOURNAL_COLUMNS)
+                    writer.writerows(entries.itertuples(index=False))
+                    f.flush()
+                    os.fsync(f.fileno())
+            except Exception as e:
+                print(f"Error writing upload journal {path}: {e}")
+
+
+def get_journal_values(mentions, rows):
+    """ids, sentiment and tags of the given rows as strings."""
+    rows = np.asarray(rows, dtype=np.intp)
+    values = [
+        pd.Series(mentions.column(name)[rows], dtype=object).astype(str)
+        for name in JOURNAL_COLUMNS[:3]
+    ]
+    tags = (
+        mentions.tags[rows]
+        if mentions.tags is not None
+        else np.full(len(rows), "", dtype=object)
+    )
+    values.append(pd.Series(tags, dtype=object).astype(str))
+    return values
+
+
+def needs_newline(f) -> bool:
+    f.seek(0, os.SEEK_END)
+    if f.tell() == 0:
+        return False
+    f.seek(f.tell() - 1)
+    return f.read(1) != "\n"
+
+
+def prune_journals(journal_dir, max_age_days=JOURNAL_MAX_AGE_DAYS):
+    cutoff = time.time() - max_age_days * 24 * 60 * 60
+    for name in os.listdir(journal_dir):
+        path = os.path.join(journal_dir, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
@@ -36,7 +36,9 @@ def setup_bw_upload(
         log_message(f"-------\nReading file: '{os.path.basename(input_file)}'...")
 
         try:
-            df = file_operations.read_file(input_file, log_message)
+            df = file_operations.read_file(
+                input_file, log_message, usecols=bw_api_handling.BW_COLUMNS
+            )
         except ValueError as e:
             log_message(f"Error: {str(e)}")
             messagebox.showerror("Error", str(e))
@@ -1,6 +1,7 @@
 import asyncio
 import threading
 import os
+import numpy as np
 import pandas as pd
 from tkinter import messagebox
 import time
@@ -15,6 +16,16 @@ from . import (
     multi_company_analysis,
 )
 
+# Columns the batch handler reads or writes (see get_working_frame); the
+# mention row column only exists in the company pairs of separate company analysis
+WORKING_FRAME_COLUMNS = [
+    "Full Text",
+    "AnalyzedCompany",
+    multi_company_analysis.MENTION_ROW_COLUMN,
+    "Sentiment",
+    "Probs",
+]
+
 
 def handle_error(log_message, enable_button, message: str):
     log_message(f"Error: {message}")
@@ -57,13 +68,29 @@ def run_sentiment_analysis_thread(
     log_message,
     enable_button,
 ):
+    bw_pipeline = None
     try:
         log_message(
             f"-------\nReading file: '{os.path.basename(config.input_file)}'..."
         )
 
+        company_column = (
+            config.company_column
+            if config.customization_option == "Multi-Company"
+            else None
+        )
         try:
-            df = file_operations.read_file(config.input_file, log_message)
+            df = file_operations.read_file(
+                config.input_file,
+                log_message,
+                # A result-only output carries no other columns through
+                usecols=(
+                    file_operations.WorkingColumns(company_column)
+                    if config.results_only_output
+                    else None
+                ),
+                company_column=company_column,
+            )
         except ValueError as e:
             raise ValueError(f"Error reading file: {str(e)}")
 
@@ -76,25 +103,38 @@ def run_sentiment_analysis_thread(
                 handle_error(log_message, enable_button, error_message)
                 return
 
+        # Sentiment already in Brandwatch, kept before it gets overwritten
+        bw_state = None
+        if config.update_brandwatch and config.bw_changed_only:
+            bw_state = bw_api_handling.get_bw_state(df)
+            if bw_state is None:
+                log_message(
+                    "The input file has no Sentiment column to compare with, so all mentions will be uploaded to Brandwatch."
+                )
+
         if "Sentiment" not in df.columns:
             df["Sentiment"] = ""
 
-        if config.output_probabilities:
-            if "Probs" not in df.columns:
-                df["Probs"] = ""
-            cols = df.columns.tolist()
-            sentiment_index = cols.index("Sentiment")
-            cols = (
-                cols[: sentiment_index + 1] + ["Probs"] + cols[sentiment_index + 1 : -1]
-            )
-            df = df[cols]
+        if config.output_probabilities and "Probs" not in df.columns:
+            # Inserted in place (right after Sentiment) rather than reordering a copy
+            df.insert(df.columns.get_loc("Sentiment") + 1, "Probs", np.nan)
 
+        file_operations.compact_columns(
+            df,
+            config.company_column
+            if config.customization_option == "Multi-Company"
+            else None,
+        )
+
+        # (mention, company) pairs classified instead of df for separate
+        # company analysis (see multi_company_analysis.get_company_pairs)
+        company_pairs = None
         if config.customization_option == "Multi-Company":
             try:
                 df = multi_company_analysis.setup_multi_company(
                     df, config.company_column, config.multi_company_entry, log_message
                 )
-                df = multi_company_analysis.process_multi_company(
+                result = multi_company_analysis.process_multi_company(
                     df,
                     config.company_column,
                     config.multi_company_entry,
@@ -104,38 +144,50 @@ def run_sentiment_analysis_thread(
             except ValueError as e:
                 handle_error(log_message, enable_button, str(e))
                 return
-            if df is None:  # User chose not to proceed
+            if result is None:  # User chose not to proceed
                 log_message("Analysis cancelled by user.")
                 enable_button()
                 return
+            df, company_pairs = result
+
+        # Stream finished mentions to Brandwatch while classification runs.
+        # Separate company analysis only has final values after the merge,
+        # so it still uploads at the end.
+        if config.update_brandwatch and company_pairs is None:
+            log_message("Brandwatch updates will be sent as mentions are classified.")
+            bw_pipeline = bw_api_handling.BWUploadPipeline(df, log_message, bw_state)
+        on_results = bw_pipeline.add_results if bw_pipeline is not None else None
 
+        analysis_df = company_pairs if company_pairs is not None else df
         if config.use_dual_models:
-            df, start_time = run_dual_model_analysis(
-                config, df, update_progress_gui, log_message
+            analysis_df, start_time = run_dual_model_analysis(
+                config, analysis_df, update_progress_gui, log_message, on_results
             )
         else:
+            working_df = get_working_frame(analysis_df)
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-            df, start_time = loop.run_until_complete(
+            working_df, start_time = loop.run_until_complete(
                 async_core_logic.batch_processing_handler(
                     config,
-                    df,
+                    working_df,
                     update_progress_gui,
                     log_message,
+                    on_results,
                 )
             )
             loop.close()
+            analysis_df = apply_working_results(analysis_df, [working_df])
 
-        if (
-            config.customization_option == "Multi-Company"
-            and config.separate_company_analysis
-        ):
+        if company_pairs is not None:
             df = multi_company_analysis.merge_separate_company_results(
-                df, config.update_brandwatch
+                df, analysis_df, config.update_brandwatch
             )
             log_message(
                 f"Merged expanded seperate company results back into {len(df)} mentions."
             )
+        else:
+            df = analysis_df
 
         sentiment_counts = df["Sentiment"].value_counts()
         log_message("Sentiment Distribution for output file:")
@@ -144,11 +196,19 @@ def run_sentiment_analysis_thread(
             percentage = (count / len(df)) * 100
             log_message(f"{sentiment}: {count} ({percentage:.1f}%)")
 
-        file_operations.write_file(df, config.output_file, log_message)
+        file_operations.write_file(
+            df, config.output_file, log_message, config.results_only_output
+        )
 
         if config.update_brandwatch:
             log_message(f"-------\nUpdating sentiment values in Brandwatch...")
-            bw_api_handling.update_bw_sentiment(df, update_progress_gui, log_message)
+            if bw_pipeline is not None:
+                bw_pipeline.finish()
+                update_progress_gui(95)
+            else:
+                bw_api_handling.update_bw_sentiment(
+                    df, update_progress_gui, log_message, bw_state
+                )
             log_message("Brandwatch upload completed.")
 
         update_progress_gui(100)
@@ -168,6 +228,8 @@ def run_sentiment_analysis_thread(
         return
 
     except Exception as e:
+        if bw_pipeline is not None:
+            bw_pipeline.finish(cancel=True)
         handle_error(log_message, enable_button, str(e))
         return
 
@@ -177,6 +239,7 @@ def run_dual_model_analysis(
     df: pd.DataFrame,
     update_progress_gui,
     log_message,
+    on_results=None,
 ):
     log_message(
         f"Starting dual model analysis with {config.model_display_name} ({config.model_split_percentage}%) and {config.second_model_display_name} ({100-config.model_split_percentage}%)..."
@@ -185,10 +248,16 @@ def run_dual_model_analysis(
     total_rows = len(df)
     split_index = int(total_rows * (config.model_split_percentage / 100))
 
-    # Randomly shuffle DataFrame and split
-    shuffled_df = df.sample(frac=1, random_state=42).reset_index(drop=True)
-    df1 = shuffled_df.iloc[:split_index].copy()
-    df2 = shuffled_df.iloc[split_index:].copy()
+    # Randomly assign rows to each model (narrow working frames, original order kept)
+    shuffled_rows = np.random.default_rng(42).permutation(total_rows)
+    first_rows = np.sort(shuffled_rows[:split_index])
+    if config.combined_company_requests and multi_company_analysis.MENTION_ROW_COLUMN in df.columns:
+        # Keep each mention's company pairs together so they can share a request
+        rows = df[multi_company_analysis.MENTION_ROW_COLUMN].to_numpy()
+        first_rows = np.flatnonzero(np.isin(rows, rows[first_rows]))
+    second_rows = np.setdiff1d(np.arange(total_rows), first_rows)
+    df1 = get_working_frame(df, first_rows)
+    df2 = get_working_frame(df, second_rows)
 
     # Create configs for each model
     config1 = copy.deepcopy(config)
@@ -207,6 +276,7 @@ def run_dual_model_analysis(
             df1,
             lambda x: update_progress_gui(x * first_model_weight),
             log_message,
+            on_results,
         )
     )
     loop.close()
@@ -220,13 +290,38 @@ def run_dual_model_analysis(
             df2,
             lambda x: update_progress_gui(60 * first_model_weight + x * (1 - first_model_weight)),
             log_message,
+            on_results,
         )
     )
     loop.close()
 
-    # Merge results back together
-    result_df = pd.concat([df1, df2])
-    # Restore original order
-    result_df = result_df.reindex(df.index)
+    # Write both models' results back into the full DataFrame
+    result_df = apply_working_results(df, [df1, df2])
 
     return result_df, start_time2
+
+
+def get_working_frame(df, rows=None):
+    """Narrow copy of just the columns classification reads and writes, so the
+    batch handler never copies the full-width export."""
+    columns = [column for column in WORKING_FRAME_COLUMNS if column in df.columns]
+    if rows is None:
+        # All rows: share the columns (results are written back from it anyway)
+        return pd.DataFrame({column: df[column] for column in columns}, copy=False)
+    return pd.DataFrame({column: df[column].take(rows) for column in columns}, copy=False)
+
+
+def apply_working_results(df, working_dfs):
+    """Copy results from the working frames back into the full DataFrame and
+    drop the rows token counting removed as invalid."""
+    for working_df in working_dfs:
+        file_operations.set_labels(
+            df, "Sentiment", working_df.index, working_df["Sentiment"].to_numpy()
+        )
+        if "Probs" in working_df.columns:
+            df.loc[working_df.index, "Probs"] = working_df["Probs"].to_numpy()
+
+    if sum(len(working_df) for working_df in working_dfs) < len(df):
+        processed = np.concatenate([working_df.index for working_df in working_dfs])
+        df = df.drop(index=df.index[~df.index.isin(processed)])
+    return df
@@ -1,13 +1,68 @@
 import os
+import csv
+import glob
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-from io import BytesIO
+from io import BytesIO, TextIOWrapper
 import zipfile
 
+import openpyxl
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.dataset as pa_dataset
+    import pyarrow.feather as pa_feather
+    import pyarrow.parquet as pa_parquet
+except ImportError:
+    pa = pa_csv = pa_dataset = pa_feather = pa_parquet = None
+
+try:
+    import xlsxwriter  # streaming xlsx writer
+except ImportError:
+    xlsxwriter = None
+
+try:
+    from python_calamine import CalamineWorkbook  # optional, faster xlsx parsing
+except ImportError:
+    CalamineWorkbook = None
+
+HEADER_SEARCH_ROWS = 20
+CSV_BLOCK_SIZE = 8 << 20  # bytes per streamed csv block
+ARROW_EXTENSIONS = [".parquet", ".feather"]
+ARROW_COMPRESSION = "zstd"
+EXCEL_MAX_ROWS = 1048576  # including the header row
+EXCEL_WRITE_CHUNK_ROWS = 20_000  # rows converted to Python values at a time
+# Result-only ("delta") output: keys to join on plus the columns the run produces
+RESULT_KEY_COLUMNS = ["Query Id", "Resource Id"]
+RESULT_COLUMNS = ["Sentiment", "Probs", "Combined_Sentiment", "BW_Tags"]
+ROW_KEY_COLUMN = "Row"  # used when the input has no BW ids
+# Identify the header of a result-only output, which has no text column
+RESULT_HEADER_COLUMNS = RESULT_KEY_COLUMNS + ["Sentiment"]
+INPUT_EXTENSIONS = [".csv", ".xlsx", ".xls", ".zip"] + ARROW_EXTENSIONS
+# Added when a job reads several files (directory, glob or multi-csv zip)
+SOURCE_FILE_COLUMN = "Source File"
+SOURCE_ROW_COLUMN = "Source Row"
+# df.attrs key: source name -> the columns that file had
+SOURCE_COLUMNS_ATTR = "source_columns"
+ID_COLUMNS = ["Query Id", "Resource Id"]
+# Working columns whose values are mostly unique, so never categorical
+STRING_COLUMNS = ID_COLUMNS + ["Date", "BW_Tags"]
+SENTIMENT_LABELS = ["Positive", "Neutral", "Negative", "Error"]
+TEXT_COLUMNS = ["Full Text", "Content"]
+# Columns read or written during classification and BW upload; the rest of
+# an export is only carried through to the output file
+WORKING_COLUMNS = TEXT_COLUMNS + [
+    "Query Id", "Resource Id", "Date", "Sentiment", "Probs", "BW_Tags",
+]
+
 
 def check_file_paths(input_file, output_file):
     if not input_file or not output_file:
         raise ValueError("Please provide both input and output file paths.")
-    if not os.path.exists(input_file):
+    if not os.path.exists(input_file) and not glob.glob(input_file):
         raise ValueError(f"The file '{os.path.basename(input_file)}' does not exist.")
     
     if not os.path.splitext(output_file)[1]:
@@ -17,48 +72,143 @@ def check_file_paths(input_file, output_file):
         output_file = os.path.join(os.path.dirname(input_file), output_file)
     
     output_file_extension = os.path.splitext(output_file)[1]
-    if output_file_extension not in [".xlsx", ".csv"]:
-        raise ValueError("Output file must be a .xlsx or .csv file.")
+    if output_file_extension not in [".xlsx", ".csv"] + ARROW_EXTENSIONS:
+        raise ValueError("Output file must be a .xlsx, .csv, .parquet, or .feather file.")
     
     return output_file
 
 
-def read_file(input_file, log_message):
+def read_file(input_file, log_message, usecols=None, company_column=None):
+    # input_file can also be a directory, a glob, or a zip with several csvs
+    sources = resolve_input_sources(input_file)
+    if len(sources) == 1:
+        path, member = sources[0]
+        return read_source(path, member, log_message, usecols, company_column)
+    return read_sources_parallel(sources, log_message, usecols, company_column)
+
+
+def read_source(input_file, zip_member, log_message, usecols=None, company_column=None):
     file_extension = os.path.splitext(input_file)[1].lower()
-    temp_dir = None
     if file_extension == ".zip":
-        try:
-            extracted_file = extract_zip_file(input_file, log_message)
-            temp_dir = os.path.dirname(os.path.dirname(extracted_file))  # Get the root temp dir
-            df = read_csv_file(extracted_file, log_message)
-        finally:
-            if temp_dir and os.path.exists(temp_dir):
-                try:
-                    # Remove all files and subdirectories recursively
-                    for root, dirs, files in os.walk(temp_dir, topdown=False):
-                        for name in files:
-                            os.remove(os.path.join(root, name))
-                        for name in dirs:
-                            os.rmdir(os.path.join(root, name))
-                    os.rmdir(temp_dir)
-                    print("Cleaned up temporary extraction files")
-                except Exception as e:
-                    print(f"Warning: Failed to clean up temporary files: {str(e)}")
-        return df
+        # Parse the csv straight from the archive instead of extracting it to disk
+        with zipfile.ZipFile(input_file, "r") as zip_ref:
+            log_message(f"Reading {zip_member} from zip archive...")
+            return read_csv_file(
+                zip_member, log_message, usecols, company_column, zip_ref=zip_ref
+            )
     elif file_extension == ".csv":
-        return read_csv_file(input_file, log_message)
+        return read_csv_file(input_file, log_message, usecols, company_column)
     elif file_extension in [".xlsx", ".xls"]:
-        return read_excel_file(input_file, log_message)
+        return read_excel_file(input_file, log_message, usecols)
+    elif file_extension in ARROW_EXTENSIONS:
+        return read_arrow_file(input_file, log_message, usecols, company_column)
     else:
-        raise ValueError("Input file must be a .xlsx, .csv, or .zip file (and file name can't have periods)")
+        raise ValueError("Input file must be a .xlsx, .csv, .zip, .parquet, or .feather file (and file name can't have periods)")
+
+
+def resolve_input_sources(input_path):
+    """(file path, zip member or None) for every file the job reads."""
+    if os.path.isdir(input_path):
+        paths = sorted(
+            os.path.join(input_path, name)
+            for name in os.listdir(input_path)
+            if os.path.splitext(name)[1].lower() in INPUT_EXTENSIONS
+        )
+    elif any(char in input_path for char in "*?["):
+        paths = sorted(
+            path
+            for path in glob.glob(input_path)
+            if os.path.splitext(path)[1].lower() in INPUT_EXTENSIONS
+        )
+    else:
+        paths = [input_path]
+
+    if not paths:
+        raise ValueError(f"No .xlsx, .csv, .zip, .parquet, or .feather files found for '{input_path}'.")
+
+    sources = []
+    for path in paths:
+        if os.path.splitext(path)[1].lower() == ".zip":
+            with zipfile.ZipFile(path, "r") as zip_ref:
+                sources.extend((path, member) for member in get_zip_csv_members(zip_ref))
+        else:
+            sources.append((path, None))
+    return sources
+
+
+def read_sources_parallel(sources, log_message, usecols=None, company_column=None):
+    log_message(f"Reading {len(sources)} files in parallel...")
+    max_workers = min(len(sources), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(
+            executor.map(
+                read_source_worker,
+                sources,
+                itertools.repeat(usecols),
+                itertools.repeat(company_column),
+            )
+        )
+
+    frames = []
+    source_columns = {}
+    source_names = get_source_names(sources)
+    for source_name, (df, messages) in zip(source_names, results):
+        for message in messages:
+            log_message(f"{source_name}: {message}")
+        if "Content" in df.columns and "Full Text" not in df.columns:
+            df = df.rename(columns={"Content": "Full Text"})
+        source_columns[source_name] = list(df.columns)
+        # Kept through the run so the output can be split back per file
+        df[SOURCE_FILE_COLUMN] = source_name
+        df[SOURCE_ROW_COLUMN] = np.arange(len(df))
+        # All-NA columns (e.g. an empty Sentiment) would otherwise decide the
+        # combined dtype; they are filled back in as missing below
+        frames.append(df.dropna(axis=1, how="all"))
+
+    columns = list(
+        dict.fromkeys(
+            [column for names in source_columns.values() for column in names]
+            + [SOURCE_FILE_COLUMN, SOURCE_ROW_COLUMN]
+        )
+    )
+    df = pd.concat(frames, ignore_index=True).reindex(columns=columns)
+    df[SOURCE_FILE_COLUMN] = df[SOURCE_FILE_COLUMN].astype("category")
+    # Read back by write_file, so each output only gets its own file's columns
+    df.attrs[SOURCE_COLUMNS_ATTR] = source_columns
+    log_message(f"Combined {len(sources)} files into {len(df)} mentions.")
+    return df
+
+
+def read_source_worker(source, usecols, company_column):
+    # Runs in a worker process, so log messages are sent back with the result
+    messages = []
+    path, member = source
+    df = read_source(path, member, messages.append, usecols, company_column)
+    return df, messages
 
 
-def read_csv_file(input_file, log_message):
+def get_source_names(sources):
+    names = []
+    for path, member in sources:
+        name = os.path.basename(member or path)
+        if name in names:
+            name = f"{os.path.splitext(os.path.basename(path))[0]}_{name}"
+        names.append(name)
+    return names
+
+
+def read_csv_file(input_file, log_message, usecols=None, company_column=None, zip_ref=None):
+    # input_file is a member name when reading from an open zip archive
+    def open_csv():
+        return zip_ref.open(input_file) if zip_ref else open(input_file, "rb")
+
     # Read the first 20 rows to check for metadata
-    try:
-        with open(input_file, "r", encoding="utf-8") as f:
-            first_20_lines = [next(f) for _ in range(20)]
-    except StopIteration:
+    with open_csv() as raw, TextIOWrapper(raw, encoding="utf-8-sig") as f:
+        first_20_lines = list(itertools.islice(f, HEADER_SEARCH_ROWS))
+    # Result-only outputs of small jobs are shorter
+    if len(first_20_lines) < HEADER_SEARCH_ROWS and not (
+        first_20_lines and accepts_result_only(usecols)
+    ):
         raise ValueError("The csv file is empty or has less than 20 lines.")
 
     # Find the header row
@@ -67,51 +217,290 @@ def read_csv_file(input_file, log_message):
         if "Full Text" in line or "Content" in line:
             header_row = i
             break
-    if header_row is None:
-        raise ValueError(
-            "The input file does not contain the required column 'Full Text' or 'Content'."
+    if header_row is None and accepts_result_only(usecols):
+        header_row = next(
+            (
+                i
+                for i, line in enumerate(first_20_lines)
+                if all(column in line for column in RESULT_HEADER_COLUMNS)
+            ),
+            None,
         )
+    if header_row is None:
+        raise ValueError(get_missing_header_message(usecols))
 
     log_message(f"Found header row at line {header_row + 1}")
 
     # Read the CSV file, skipping rows above the header
     log_message(f"Processing the full csv...")
-    df = pd.read_csv(input_file, skiprows=header_row)
+    if pa_csv is not None:
+        columns = dedupe_column_names(next(csv.reader([first_20_lines[header_row]])))
+        try:
+            with open_csv() as f:
+                return read_csv_arrow(f, header_row, columns, usecols, company_column)
+        except pa.ArrowInvalid as e:
+            log_message(f"Fast csv reader failed ({e}). Using the standard reader...")
 
+    with open_csv() as f:
+        df = pd.read_csv(
+            f,
+            skiprows=header_row,
+            usecols=(lambda column: column in usecols) if usecols is not None else None,
+            dtype={column: str for column in ID_COLUMNS},
+        )
+
+    return df
+
+
+def read_arrow_file(input_file, log_message, usecols=None, company_column=None):
+    if pa is None:
+        raise ValueError("Reading .parquet and .feather files requires pyarrow.")
+
+    file_format = "parquet" if input_file.lower().endswith(".parquet") else "feather"
+    dataset = pa_dataset.dataset(input_file, format=file_format)
+    columns = dataset.schema.names
+    if not any(column in columns for column in TEXT_COLUMNS) and not (
+        accepts_result_only(usecols)
+        and all(column in columns for column in RESULT_HEADER_COLUMNS)
+    ):
+        raise ValueError(get_missing_header_message(usecols))
+
+    # Column projection: only the requested columns are read from disk
+    log_message(f"Processing the full {file_format} file...")
+    table = dataset.to_table(
+        columns=[column for column in columns if usecols is None or column in usecols]
+    )
+    return arrow_table_to_frame(table, company_column)
+
+
+def read_csv_arrow(input_file, header_row, columns, usecols=None, company_column=None):
+    # Streamed in blocks, which keeps peak memory well below a one-shot read
+    reader = pa_csv.open_csv(
+        input_file,
+        read_options=pa_csv.ReadOptions(
+            skip_rows=header_row + 1,
+            column_names=columns,
+            block_size=CSV_BLOCK_SIZE,
+        ),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=[
+                column for column in columns if usecols is None or column in usecols
+            ],
+            # keep dates and ids exactly as exported; prepare_data_for_bw
+            # parses dates, and ids past 15 digits don't survive as numbers
+            column_types={column: pa.string() for column in ["Date"] + ID_COLUMNS},
+        ),
+    )
+    table = reader.read_all()
+    df = arrow_table_to_frame(table, company_column)
+    del table
+    pa.default_memory_pool().release_unused()  # hand parse buffers back to the OS
     return df
 
 
-def read_excel_file(input_file, log_message):
+def arrow_table_to_frame(table, company_column=None):
+    """Convert the columns the pipeline works on to regular pandas dtypes (text as
+    Arrow-backed strings, company and sentiment labels as categoricals) and carry
+    every other column through as ArrowDtype, which avoids building a Python
+    object per cell."""
+    # Ignore pandas dtypes stored by to_parquet/to_feather so every source converts alike
+    table = table.replace_schema_metadata(None)
+    text_types_mapper = {
+        pa.string(): pd.StringDtype("pyarrow"),
+        pa.large_string(): pd.StringDtype("pyarrow"),
+    }.get
+
+    columns = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if name in TEXT_COLUMNS or name in ["Date"] + ID_COLUMNS:
+            columns[name] = column.to_pandas(types_mapper=text_types_mapper)
+        elif not is_working_column(name, company_column):
+            columns[name] = column.to_pandas(types_mapper=pd.ArrowDtype)
+        elif pa.types.is_string(column.type) and name not in STRING_COLUMNS:
+            # Few distinct values (company flags, sentiment labels)
+            columns[name] = column.dictionary_encode().to_pandas()
+        else:
+            columns[name] = column.to_pandas()
+    # Columns are converted one at a time and assembled without another copy
+    return pd.DataFrame(columns, copy=False)
+
+
+def compact_columns(df, company_column=None):
+    """Store the repetitive working columns compactly (in place): ids as
+    Arrow-backed strings, company columns as categoricals and Sentiment as an
+    int8-coded categorical."""
+    for column in ID_COLUMNS:
+        # Not numbers: Excel keeps only 15 digits of 19-digit resource ids
+        if column in df.columns and df[column].dtype != pd.StringDtype("pyarrow"):
+            df[column] = df[column].astype(pd.StringDtype("pyarrow"))
+
+    company_columns = [
+        column
+        for column in df.columns
+        if is_working_column(column, company_column)
+        and column not in WORKING_COLUMNS
+        and not isinstance(df[column].dtype, pd.CategoricalDtype)
+    ]
+    for column in company_columns:
+        df[column] = df[column].astype("category")
+
+    if "Sentiment" in df.columns:
+        df["Sentiment"] = to_label_column(df["Sentiment"])
+    return df
+
+
+def to_label_column(values):
+    labels = pd.Categorical(values)
+    new_labels = [label for label in SENTIMENT_LABELS if label not in labels.categories]
+    return pd.Series(labels.add_categories(new_labels), index=values.index)
+
+
+def set_labels(df, column, index, labels):
+    if not isinstance(df[column].dtype, pd.CategoricalDtype):
+        df[column] = to_label_column(df[column])
+    # Categorical columns only accept known categories, so add unseen labels first
+    unseen = pd.Index(pd.unique(pd.Series(labels, dtype=object).dropna()))
+    unseen = unseen.difference(df[column].cat.categories)
+    if len(unseen):
+        df[column] = df[column].cat.add_categories(unseen)
+    df.loc[index, column] = labels
+
+
+def is_working_column(column, company_column=None):
+    if column in WORKING_COLUMNS:
+        return True
+    return bool(company_column) and (
+        column == company_column or column.startswith(f"{company_column} - ")
+    )
+
+
+class WorkingColumns:
+    """usecols for reads that only need the working columns, including the
+    company column and its "<company column> - <company>" flag columns."""
+
+    def __init__(self, company_column=None):
+        self.company_column = company_column
+
+    def __contains__(self, column):
+        return is_working_column(column, self.company_column)
+
+
+def read_excel_file(input_file, log_message, usecols=None):
     try:
-        # Try reading the first 20 rows
-        df = pd.read_excel(input_file, header=None, nrows=20)
+        df = load_excel_rows(input_file, log_message, usecols)
     except IndexError:
         log_message("IndexError encountered. Attempting to modify styles.xml...")
         modified_file = modify_styles_xml(input_file)
         log_message("Modified styles.xml. Attempting to read again...")
         try:
-            df = pd.read_excel(modified_file, header=None, nrows=20)
+            df = load_excel_rows(modified_file, log_message, usecols)
         except Exception as e:
             log_message(f"Error even after modifying styles.xml: {str(e)}")
             raise
+
+    return df
+
+
+def load_excel_rows(source, log_message, usecols=None):
+    """Stream the first sheet once, detecting the header row from the rows
+    already read instead of re-parsing the workbook."""
+    rows = iter_excel_rows(source)
+    first_rows = list(itertools.islice(rows, HEADER_SEARCH_ROWS))
+
+    # 'Full Text' takes precedence over 'Content' anywhere in the first rows
+    for text_column in TEXT_COLUMNS:
+        header_row = next(
+            (i for i, row in enumerate(first_rows) if text_column in row), None
+        )
+        if header_row is not None:
+            log_message(f"'{text_column}' column found. Processing the full xlsx...")
+            break
     else:
-        modified_file = input_file
-
-    # Check for 'Full Text' or 'Content' in first 20 rows
-    if "Full Text" in df.iloc[:20].values:
-        full_text_row = df.iloc[:20].isin(["Full Text"]).any(axis=1).idxmax()
-        log_message("'Full Text' column found. Processing the full xlsx...")
-    elif "Content" in df.iloc[:20].values:
-        full_text_row = df.iloc[:20].isin(["Content"]).any(axis=1).idxmax()
-        log_message("'Content' column found. Processing the full xlsx...")
-    else:
-        raise ValueError(
-            "The input file does not contain the required column 'Full Text' or 'Content'."
+        header_row = None
+        if accepts_result_only(usecols):
+            header_row = next(
+                (
+                    i
+                    for i, row in enumerate(first_rows)
+                    if all(column in row for column in RESULT_HEADER_COLUMNS)
+                ),
+                None,
+            )
+        if header_row is None:
+            raise ValueError(get_missing_header_message(usecols))
+        log_message("Result-only file found. Processing the full xlsx...")
+
+    columns = dedupe_column_names(first_rows[header_row])
+    keep = [
+        i for i, column in enumerate(columns) if usecols is None or column in usecols
+    ]
+    width = len(columns)
+
+    data = []
+    for row in itertools.chain(first_rows[header_row + 1 :], rows):
+        if len(row) < width:  # read-only sheets can have ragged rows
+            row = tuple(row) + (None,) * (width - len(row))
+        data.append([row[i] for i in keep])
+
+    # Drop trailing empty rows (pandas.read_excel does the same)
+    while data and all(value is None for value in data[-1]):
+        data.pop()
+
+    df = pd.DataFrame(data, columns=[columns[i] for i in keep])
+    return df.infer_objects()
+
+
+def iter_excel_rows(source):
+    if CalamineWorkbook is not None:
+        if hasattr(source, "read"):
+            workbook = CalamineWorkbook.from_filelike(source)
+        else:
+            workbook = CalamineWorkbook.from_path(source)
+        sheet = workbook.get_sheet_by_index(0)
+        # One row at a time, rather than the whole sheet as Python lists.
+        # iter_rows skips leading empty columns; keep them, as openpyxl does
+        empty_columns = (None,) * sheet.start[1] if sheet.start else ()
+        for row in sheet.iter_rows():
+            yield empty_columns + tuple(None if value == "" else value for value in row)
+        return
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def accepts_result_only(usecols):
+    # Result-only outputs have no text column, so they are only read when the
+    # caller doesn't need the text (BW Upload Only reads just the BW columns)
+    return usecols is not None and not any(column in usecols for column in TEXT_COLUMNS)
+
+
+def get_missing_header_message(usecols):
+    if accepts_result_only(usecols):
+        return (
+            "The input file does not contain the required column 'Full Text' or 'Content', "
+            "or the 'Query Id', 'Resource Id' and 'Sentiment' columns of a result-only output."
         )
+    return "The input file does not contain the required column 'Full Text' or 'Content'."
 
-    df = pd.read_excel(modified_file, header=full_text_row)
 
-    return df
+def dedupe_column_names(header):
+    # Match pandas' naming for blank and repeated headers
+    columns = []
+    seen = {}
+    for i, name in enumerate(header):
+        name = f"Unnamed: {i}" if name is None else str(name)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
 
 
 def modify_styles_xml(excel_file):
@@ -140,40 +529,220 @@ def modify_styles_xml(excel_file):
     return excel_file
 
 
-def extract_zip_file(zip_path, log_message):
-    temp_dir = os.path.join(os.path.dirname(zip_path), f"temp_extracted_{os.getpid()}")
-    os.makedirs(temp_dir, exist_ok=True)
-    
-    try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            file_list = zip_ref.namelist()
-            if not file_list:
-                raise ValueError("The zip file is empty.")
-            
-            csv_files = [f for f in file_list if f.lower().endswith('.csv')]
-            if not csv_files:
-                raise ValueError("No CSV file found in the zip archive.")
-            
-            csv_file = csv_files[0]
-            log_message(f"Extracting {csv_file} from zip archive...")
-            extracted_path = zip_ref.extract(csv_file, temp_dir)
-            
-            return extracted_path
-    except Exception:
-        raise
-
-
-def write_file(df, output_file, log_message):
+def get_zip_csv_members(zip_ref):
+    file_list = zip_ref.namelist()
+    if not file_list:
+        raise ValueError("The zip file is empty.")
+
+    csv_files = [f for f in file_list if f.lower().endswith('.csv')]
+    if not csv_files:
+        raise ValueError("No CSV file found in the zip archive.")
+
+    return csv_files
+
+
+def write_file(df, output_file, log_message, results_only=False):
     output_file_extension = os.path.splitext(output_file)[1].lower()
     log_message(f"Saving results to a {output_file_extension}...")
     if "Token Count" in df.columns:
         df.drop(columns=["Token Count"], inplace=True)
+    if results_only:
+        log_message(
+            f"Writing only the result columns: {', '.join(get_result_columns(df.head(0)).columns)}"
+        )
+
+    if SOURCE_FILE_COLUMN not in df.columns:
+        write_frame(
+            get_result_columns(df) if results_only else df, output_file, log_message
+        )
+        output_files = [output_file]
+    else:
+        # Multi-file jobs are split back into one output per input file
+        output_stem = os.path.splitext(output_file)[0]
+        output_files = []
+        for source_name, source_df in df.groupby(
+            SOURCE_FILE_COLUMN, sort=False, observed=True
+        ):
+            source_output_file = (
+                f"{output_stem}_{os.path.splitext(source_name)[0]}{output_file_extension}"
+            )
+            if results_only:
+                source_df = get_result_columns(source_df)
+            else:
+                source_df = source_df[get_source_output_columns(df, source_name)]
+            write_frame(source_df, source_output_file, log_message)
+            output_files.append(source_output_file)
+
+    for path in output_files:
+        # Normalize path with forward slashes for consistent logging
+        normalized_path = path.replace('\\', '/')
+        log_message(f"Results saved to {normalized_path}.")
+
+
+def get_source_output_columns(df, source_name):
+    """The columns one input file had, plus the ones the run added, without
+    the columns that only came from the other input files."""
+    source_columns = df.attrs.get(SOURCE_COLUMNS_ATTR, {})
+    input_columns = {column for names in source_columns.values() for column in names}
+    own_columns = set(source_columns.get(source_name, input_columns))
+    return [
+        column
+        for column in df.columns
+        if column not in (SOURCE_FILE_COLUMN, SOURCE_ROW_COLUMN)
+        and (
+            column in own_columns
+            or column not in input_columns
+            or column in RESULT_COLUMNS
+        )
+    ]
+
+
+def write_frame(df, output_file, log_message):
+    output_file_extension = os.path.splitext(output_file)[1].lower()
     if output_file_extension == ".csv":
         df.to_csv(output_file, index=False)
     elif output_file_extension in [".xlsx", ".xls"]:
-        df.to_excel(output_file, index=False)
+        write_excel_file(df, output_file, log_message)
+    elif output_file_extension == ".parquet":
+        pa_parquet.write_table(
+            frame_to_arrow_table(df), output_file, compression=ARROW_COMPRESSION
+        )
+    elif output_file_extension == ".feather":
+        pa_feather.write_feather(
+            frame_to_arrow_table(df), output_file, compression=ARROW_COMPRESSION
+        )
     else:
-        raise ValueError("Output file must be a .xlsx or .csv.")
-    # Normalize path with forward slashes for consistent logging
-    normalized_path = output_file.replace('\\', '/')
-    log_message(f"Results saved to {normalized_path}.")
+        raise ValueError("Output file must be a .xlsx, .csv, .parquet, or .feather.")
+
+
+def frame_to_arrow_table(df):
+    # Result columns can mix strings and numbers (e.g. "" placeholders in Probs),
+    # which Arrow can't store in one column, so write those as text
+    mixed_columns = {
+        column: df[column].astype("string")
+        for column in df.columns
+        if df[column].dtype == object
+        and pd.api.types.infer_dtype(df[column], skipna=True) in ("mixed", "mixed-integer")
+    }
+    return pa.Table.from_pandas(df.assign(**mixed_columns), preserve_index=False)
+
+
+def write_excel_file(df, output_file, log_message):
+    """Write rows straight to disk with xlsxwriter's constant_memory mode, a chunk
+    at a time, starting a new sheet whenever Excel's row limit is reached."""
+    rows_per_sheet = EXCEL_MAX_ROWS - 1
+    if xlsxwriter is None:
+        if len(df) > rows_per_sheet:
+            raise ValueError(
+                f"{len(df)} rows don't fit in one Excel sheet. Install xlsxwriter or save as .csv."
+            )
+        df.to_excel(output_file, index=False)
+        return
+
+    workbook = xlsxwriter.Workbook(
+        output_file,
+        {
+            "constant_memory": True,
+            # Mention text is data: never turn it into links, formulas or numbers
+            "strings_to_urls": False,
+            "strings_to_formulas": False,
+            "strings_to_numbers": False,
+            "nan_inf_to_errors": True,
+            "remove_timezone": True,
+            "default_date_format": "yyyy-mm-dd hh:mm:ss",
+        },
+    )
+    header = [str(column) for column in df.columns]
+    sheet_count = max(1, -(-len(df) // rows_per_sheet))
+    if sheet_count > 1:
+        log_message(
+            f"{len(df)} rows exceed Excel's sheet limit. Splitting into {sheet_count} sheets..."
+        )
+
+    try:
+        for sheet_index in range(sheet_count):
+            worksheet = workbook.add_worksheet(f"Sheet{sheet_index + 1}")
+            worksheet.write_row(0, 0, header)
+
+            sheet_start = sheet_index * rows_per_sheet
+            sheet_end = min(sheet_start + rows_per_sheet, len(df))
+            # Convert a chunk of rows at a time, so only that chunk is ever
+            # held as Python objects
+            for chunk_start in range(sheet_start, sheet_end, EXCEL_WRITE_CHUNK_ROWS):
+                chunk_end = min(chunk_start + EXCEL_WRITE_CHUNK_ROWS, sheet_end)
+                chunk = df.iloc[chunk_start:chunk_end]
+                first_row = chunk_start - sheet_start + 1
+                for row_index, row in enumerate(get_excel_rows(chunk, header), start=first_row):
+                    worksheet.write_row(row_index, 0, row)
+    finally:
+        workbook.close()
+
+
+def get_excel_rows(chunk, header):
+    # Python scalars with None for missing values (blank cells); ids are
+    # always written as text (Excel numbers keep only 15 digits)
+    columns = [
+        chunk.iloc[:, i]
+        .astype(str if header[i] in ID_COLUMNS else object)
+        .where(chunk.iloc[:, i].notna(), None)
+        for i in range(chunk.shape[1])
+    ]
+    return zip(*columns)
+
+
+def get_result_columns(df):
+    key_columns = [column for column in RESULT_KEY_COLUMNS if column in df.columns]
+    result_columns = [column for column in RESULT_COLUMNS if column in df.columns]
+    if key_columns:
+        return df[key_columns + result_columns]
+
+    # Without BW ids, the index is the mention's row position in the input file
+    results = df[result_columns].copy()
+    row_positions = df[SOURCE_ROW_COLUMN] if SOURCE_ROW_COLUMN in df.columns else df.index
+    results.insert(0, ROW_KEY_COLUMN, row_positions)
+    return results
+
+
+def read_result_file(results_file):
+    # Result-only outputs have a plain header row (and may span several xlsx sheets)
+    file_extension = os.path.splitext(results_file)[1].lower()
+    if file_extension == ".csv":
+        return pd.read_csv(results_file, dtype={column: str for column in ID_COLUMNS})
+    elif file_extension in [".xlsx", ".xls"]:
+        sheets = pd.read_excel(
+            results_file, sheet_name=None, dtype={column: str for column in ID_COLUMNS}
+        )
+        return pd.concat(sheets.values(), ignore_index=True)
+    elif file_extension == ".parquet":
+        return pd.read_parquet(results_file)
+    elif file_extension == ".feather":
+        return pd.read_feather(results_file)
+    raise ValueError("Results file must be a .xlsx, .csv, .parquet, or .feather file.")
+
+
+def join_result_columns(df, results):
+    """Merge a result-only output back into the export it was created from."""
+    # Result columns that already exist in the export keep their position
+    column_order = list(df.columns) + [
+        column for column in results.columns if column not in df.columns
+    ]
+
+    if ROW_KEY_COLUMN in results.columns:
+        results = results.set_index(ROW_KEY_COLUMN)
+        df = df.drop(columns=[c for c in results.columns if c in df.columns])
+        return df.join(results)[[c for c in column_order if c != ROW_KEY_COLUMN]]
+
+    key_columns = [column for column in RESULT_KEY_COLUMNS if column in results.columns]
+    missing_keys = [column for column in key_columns if column not in df.columns]
+    if not key_columns or missing_keys:
+        raise ValueError(
+            "The original file and the results file don't share the 'Query Id'/'Resource Id' columns."
+        )
+    result_columns = [column for column in results.columns if column not in key_columns]
+    df = df.drop(columns=[c for c in result_columns if c in df.columns])
+    # Ids are matched as text, whichever format each file stored them in
+    df = df.assign(**{column: df[column].astype("string") for column in key_columns})
+    results = results.assign(
+        **{column: results[column].astype("string") for column in key_columns}
+    )
+    return df.merge(results, on=key_columns, how="left")[column_order]
@@ -14,14 +14,20 @@ class SentimentAnalysisConfig:
     customization_option: str
     company_entry: Optional[str] = None
     system_prompt: Optional[str] = None
+    company_list_prompt: Optional[str] = None
     user_prompt: Optional[str] = None
     user_prompt2: Optional[str] = None
     model_display_name: str = "GPT-4o mini"
     update_brandwatch: bool = False
+    bw_changed_only: bool = False
     output_probabilities: bool = False
+    results_only_output: bool = False
     company_column: Optional[str] = None
     multi_company_entry: Optional[str] = None
     separate_company_analysis: bool = False
+    combined_company_requests: bool = False
+    company_context_only: bool = False
+    company_aliases: Optional[str] = None
     temperature: float = 0.3
     max_tokens: int = 1
     model_name: str = field(init=False)
@@ -138,6 +144,8 @@ class ConfigManager:
         elif self.sentiment_config.customization_option == "Multi-Company":
             # Placeholder for company name (uses .format to replace bracketed text via string matching)
             self.sentiment_config.system_prompt = "Classify the sentiment of the following Text{toward_company} in one word from this list [Positive, Neutral, Negative]."
+            # Used for combined requests (all of a mention's companies at once)
+            self.sentiment_config.company_list_prompt = "Classify the sentiment of the following Text toward each of these companies: {companies}. Answer with a JSON object that maps each company name, exactly as given, to one word from this list [Positive, Neutral, Negative]."
             self.sentiment_config.user_prompt = "Text:"
             self.sentiment_config.user_prompt2 = "Sentiment:"
         elif self.sentiment_config.customization_option == "Custom":
@@ -0,0 +1,32 @@
+import argparse
+import os
+
+from . import file_operations
+
+
+def join_results(original_file, results_file, output_file, log_message=print):
+    """Merge a result-only output file back into the original export."""
+    output_file = file_operations.check_file_paths(original_file, output_file)
+
+    log_message(f"Reading original file: '{os.path.basename(original_file)}'...")
+    df = file_operations.read_file(original_file, log_message)
+    if "Content" in df.columns and "Full Text" not in df.columns:
+        df.rename(columns={"Content": "Full Text"}, inplace=True)
+
+    log_message(f"Reading results file: '{os.path.basename(results_file)}'...")
+    results = file_operations.read_result_file(results_file)
+
+    df = file_operations.join_result_columns(df, results)
+    file_operations.write_file(df, output_file, log_message)
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Merge a result-only output back into the original export."
+    )
+    parser.add_argument("original_file")
+    parser.add_argument("results_file")
+    parser.add_argument("output_file")
+    args = parser.parse_args()
+    join_results(args.original_file, args.results_file, args.output_file)
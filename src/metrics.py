@@ -1,114 +1,565 @@
-from datetime import datetime
-import json
+from datetime import datetime, timedelta
+import atexit
 import os
 import glob
+import json
+import queue
+import sqlite3
+import threading
+import time
+import numpy as np
 import pandas as pd
 import sys
 
+from .metrics_exporter import metrics_exporter
+
 def analyze_api_metrics(log_message, enable_button, disable_button, log_dir="api_response_logs", days=7):
-    # Get the application's base directory
     disable_button()
-    if getattr(sys, 'frozen', False):
-        # Running as compiled exe
-        base_dir = os.path.dirname(sys.executable)
-    else:
-        # Running as script
-        base_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        log_dir = get_log_dir(log_dir)
+        metrics_logger.flush()  # include requests still waiting to be written
+        store = MetricsStore(get_local_data_dir())
+        log_message(f"Looking for logs in: {store.path}")  # Debug line
 
-    log_dir = os.path.join(base_dir, log_dir)
-    log_message(f"Looking for logs in: {log_dir}")  # Debug line
-    
-    # Combine all log files
-    all_files = glob.glob(os.path.join(log_dir, "bw_api_metrics_*.csv"))
-    if not all_files:
-        log_message("\nNo API metrics files found!")
-        enable_button()
+        store.import_csv_logs(log_dir)  # one-off import of the older monthly CSV logs
+        summary = store.summarize(days)
+        if not summary["requests"] and summary["model"].empty:
+            log_message("\nNo API metrics found!")
+            return None
+
+        if summary["requests"]:
+            log_bw_summary(log_message, summary, days)
+
+        model_stats = summary["model"]
+        if not model_stats.empty:
+            log_message(f"\nModel API (last {days} days):")
+            for model, row in model_stats.iterrows():
+                log_message(
+                    f"{model}: Runs={int(row['Runs'])}, Rows={int(row['Rows'])}, Requests={int(row['Requests'])}, "
+                    f"Errors={int(row['Errors'])}, Retries={int(row['Retries'])}, "
+                    f"{row['Rows/s']:.1f} rows/s, {row['Tokens/s']:.0f} tokens/s, "
+                    f"p50={row['p50']:.2f}s, p95={row['p95']:.2f}s, p99={row['p99']:.2f}s"
+                )
+        return summary["daily"]
+    except Exception as e:
+        log_message(f"Error analyzing API metrics: {e}")
         return None
-        
-    df = pd.concat((pd.read_csv(f) for f in all_files))
-    
-    # Convert timestamp to datetime
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df['date'] = df['timestamp'].dt.date
-    
-    # Filter for last N days
-    recent_df = df[df['timestamp'] >= (pd.Timestamp.now() - pd.Timedelta(days=days))]
-    
+    finally:
+        enable_button()
+
+
+def log_bw_summary(log_message, summary, days):
     log_message("\nAPI Performance Analysis")
     log_message("-" * 50)
     log_message(f"\nLast {days} days summary:")
-    log_message(f"Total Requests: {len(recent_df)}")
-    
+    log_message(f"Total Requests: {summary['requests']}")
+
     # Success rate
-    success_rate = (recent_df['status'] == 'success').mean() * 100
+    success_rate = summary["status_counts"].get("success", 0) / summary["requests"] * 100
     log_message(f"\nSuccess Rate: {success_rate:.1f}%")
-    
+
     # Response time statistics
     log_message("\nResponse Time Statistics (seconds):")
-    stats = recent_df['total_response_time'].describe()
-    for stat_name, value in stats.items():
+    for stat_name, value in summary["response_time"].items():
         log_message(f"{stat_name}: {value:.2f}")
-    
+
     # Status breakdown
     log_message("\nStatus Breakdown:")
-    for status, count in recent_df['status'].value_counts().items():
+    for status, count in sorted(summary["status_counts"].items(), key=lambda item: -item[1]):
         log_message(f"{status}: {count}")
-    
-    # Daily success rates
-    daily_stats = recent_df.groupby('date').agg({
-        'status': lambda x: (x == 'success').mean() * 100,
-        'total_response_time': 'mean'
-    }).round(2)
-    daily_stats.columns = ['Success Rate %', 'Avg Response Time']
+
+    daily_stats = summary["daily"]
     log_message("\nDaily Metrics (last 5 days):")
     for date, row in daily_stats.tail().iterrows():
-        log_message(f"{date}: Success Rate={row['Success Rate %']}%, Avg Response Time={row['Avg Response Time']:.2f}s")
-    enable_button()
-    return df
+        log_message(
+            f"{date}: Success Rate={row['Success Rate %']}%, Avg Response Time={row['Avg Response Time']:.2f}s, p95={row['p95']:.2f}s"
+        )
+
+    hourly_stats = summary["hourly"]
+    if not hourly_stats.empty:
+        log_message("\nHourly Metrics (last 24 hours):")
+        for hour, row in hourly_stats.iterrows():
+            log_message(
+                f"{hour}:00: Requests={int(row['Requests'])}, Success Rate={row['Success Rate %']}%, p95={row['p95']:.2f}s"
+            )
+
+METRICS_FIELDS = [
+    "timestamp",
+    "status",
+    "http_response_time",
+    "total_response_time",
+    "response_code",
+    "batch_size",
+    "error_type",
+    "error_message",
+]
+FLUSH_INTERVAL = 1.0  # seconds between metrics writes
+METRICS_DB = "bw_api_metrics.db"
+LOCAL_DATA_DIR = "sentiment_analysis"
+
+# Log-spaced response time bins (10 ms to ~5 min, ~15% wide) for the
+# latency histograms kept in the rollups
+LATENCY_BIN_EDGES = np.geomspace(0.01, 300, 75)
+
+
+def get_log_dir(log_dir="api_response_logs"):
+    if getattr(sys, "frozen", False):
+        # Running as compiled exe
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        # Running as script
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, log_dir)
+
+
+def get_local_data_dir():
+    """Per-user folder on this machine for files that must not live in the
+    synced app folder (SQLite databases, upload journals)."""
+    base_dir = os.environ.get("LOCALAPPDATA") or os.path.join(
+        os.path.expanduser("~"), ".local", "share"
+    )
+    return os.path.join(base_dir, LOCAL_DATA_DIR)
+
+
+class MetricsLogger:
+    """Queues metrics records and writes them to the MetricsStore from a
+    background thread, so request code never waits on file I/O.
+
+    Records are written in batches every FLUSH_INTERVAL seconds; flush()
+    blocks until everything queued so far is on disk."""
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def log(self, record: dict) -> None:
+        self.start()
+        self.queue.put(record)
+
+    def start(self) -> None:
+        if self.thread is not None:
+            return
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+                atexit.register(self.flush)
+
+    def flush(self) -> None:
+        if self.thread is not None:
+            self.queue.join()
+
+    def run(self) -> None:
+        while True:
+            records = [self.queue.get()]
+            time.sleep(self.flush_interval)  # let the rest of the batch arrive
+            while True:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.write(records)
+            except Exception as e:
+                print(f"Error logging API response: {e}")
+            finally:
+                for _ in records:
+                    self.queue.task_done()
+
+    def write(self, records) -> None:
+        store = MetricsStore(get_local_data_dir())
+        bw_records = [record for record in records if "kind" not in record]
+        if bw_records:
+            store.add(bw_records)
+        for kind, table in (("model_request", "model_requests"), ("model_run", "model_runs")):
+            kind_records = [record for record in records if record.get("kind") == kind]
+            if kind_records:
+                store.add_rows(table, kind_records)
+
+
+class MetricsStore:
+    """SQLite store for the BW API metrics, kept in the per-user local data
+    dir: WAL files on the synced app folder would conflict between machines.
+
+    Besides the raw requests, hourly and daily rollups (request counts,
+    response time sums and latency histograms per status) are updated as
+    records are added, so summaries only read the rollup rows for the
+    requested window, however long the history is."""
+
+    def __init__(self, data_dir):
+        os.makedirs(data_dir, exist_ok=True)
+        self.path = os.path.join(data_dir, METRICS_DB)
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")  # reads don't block the logger
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS requests (
+                timestamp TEXT NOT NULL,
+                status TEXT,
+                http_response_time REAL,
+                total_response_time REAL,
+                response_code INTEGER,
+                batch_size INTEGER,
+                error_type TEXT,
+                error_message TEXT
+            );
+            CREATE INDEX IF NOT EXISTS requests_timestamp ON requests (timestamp);
+            CREATE TABLE IF NOT EXISTS rollups (
+                period TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                status TEXT NOT NULL,
+                latency_bin INTEGER NOT NULL,
+                requests INTEGER NOT NULL,
+                response_time_sum REAL NOT NULL,
+                PRIMARY KEY (period, bucket, status, latency_bin)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS imported_files (name TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS model_requests (
+                timestamp TEXT NOT NULL,
+                provider TEXT,
+                model TEXT,
+                status TEXT,
+                http_status INTEGER,
+                attempts INTEGER,
+                rate_limited INTEGER,
+                latency REAL,
+                prompt_tokens INTEGER,
+                completion_tokens INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS model_requests_timestamp ON model_requests (timestamp);
+            CREATE TABLE IF NOT EXISTS model_runs (
+                timestamp TEXT NOT NULL,
+                provider TEXT,
+                model TEXT,
+                rows INTEGER,
+                requests INTEGER,
+                errors INTEGER,
+                retries INTEGER,
+                rate_limited INTEGER,
+                prompt_tokens INTEGER,
+                completion_tokens INTEGER,
+                duration REAL,
+                latency_sum REAL,
+                latency_histogram TEXT
+            );
+            CREATE INDEX IF NOT EXISTS model_runs_timestamp ON model_runs (timestamp);
+            """
+        )
+        return conn
+
+    def add(self, records, conn=None) -> None:
+        rollups = {}
+        for record in records:
+            response_time = float(record.get("total_response_time") or 0)
+            latency_bin = int(np.searchsorted(LATENCY_BIN_EDGES, response_time))
+            timestamp = str(record["timestamp"])
+            status = str(record.get("status"))
+            for period, bucket in (("day", timestamp[:10]), ("hour", timestamp[:13])):
+                key = (period, bucket, status, latency_bin)
+                count, time_sum = rollups.get(key, (0, 0.0))
+                rollups[key] = (count + 1, time_sum + response_time)
+
+        close = conn is None
+        conn = conn or self.connect()
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO requests ({', '.join(METRICS_FIELDS)}) VALUES ({', '.join('?' * len(METRICS_FIELDS))})",
+                    [[record.get(field) for field in METRICS_FIELDS] for record in records],
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (period, bucket, status, latency_bin) DO UPDATE SET
+                        requests = requests + excluded.requests,
+                        response_time_sum = response_time_sum + excluded.response_time_sum
+                    """,
+                    [(*key, count, time_sum) for key, (count, time_sum) in rollups.items()],
+                )
+        finally:
+            if close:
+                conn.close()
+
+    def add_rows(self, table, records) -> None:
+        """Insert records into one of the model tables (keys = column names)."""
+        columns = [column for column in records[0] if column != "kind"]
+        conn = self.connect()
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    [[record.get(column) for column in columns] for record in records],
+                )
+        finally:
+            conn.close()
+
+    def import_csv_logs(self, log_dir) -> None:
+        """Load monthly CSV logs written before the store existed (once each)."""
+        all_files = glob.glob(os.path.join(log_dir, "bw_api_metrics_*.csv"))
+        if not all_files:
+            return
+        conn = self.connect()
+        try:
+            imported = {name for (name,) in conn.execute("SELECT name FROM imported_files")}
+            for log_file in all_files:
+                name = os.path.basename(log_file)
+                if name in imported:
+                    continue
+                df = pd.read_csv(log_file)
+                df = df.astype(object).where(df.notna(), None)
+                self.add(df.to_dict("records"), conn)
+                with conn:
+                    conn.execute("INSERT INTO imported_files VALUES (?)", (name,))
+        finally:
+            conn.close()
+
+    def summarize(self, days=7) -> dict:
+        since_day = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        since_hour = (datetime.now() - timedelta(hours=23)).strftime("%Y-%m-%d %H")
+        conn = self.connect()
+        try:
+            daily = pd.read_sql_query(
+                "SELECT bucket, status, latency_bin, requests, response_time_sum FROM rollups WHERE period = 'day' AND bucket >= ?",
+                conn,
+                params=(since_day,),
+            )
+            hourly = pd.read_sql_query(
+                "SELECT bucket, status, latency_bin, requests, response_time_sum FROM rollups WHERE period = 'hour' AND bucket >= ?",
+                conn,
+                params=(since_hour,),
+            )
+            model_runs = pd.read_sql_query(
+                "SELECT * FROM model_runs WHERE timestamp >= ?",
+                conn,
+                params=(since_day,),
+            )
+        finally:
+            conn.close()
+
+        requests = int(daily["requests"].sum())
+        latency_counts = daily.groupby("latency_bin")["requests"].sum()
+        return {
+            "requests": requests,
+            "status_counts": daily.groupby("status")["requests"].sum().astype(int).to_dict(),
+            "response_time": {
+                "count": requests,
+                "mean": daily["response_time_sum"].sum() / requests if requests else 0.0,
+                "p50": histogram_percentile(latency_counts, 50),
+                "p95": histogram_percentile(latency_counts, 95),
+                "p99": histogram_percentile(latency_counts, 99),
+            },
+            "daily": rollup_stats(daily),
+            "hourly": rollup_stats(hourly),
+            "model": model_run_stats(model_runs),
+        }
+
+
+def model_run_stats(model_runs: pd.DataFrame) -> pd.DataFrame:
+    """Totals, throughput and latency percentiles per model."""
+    stats = []
+    for model, runs in model_runs.groupby("model"):
+        histogram = np.sum([json.loads(h) for h in runs["latency_histogram"]], axis=0)
+        latency_counts = pd.Series(histogram)
+        duration = runs["duration"].sum()
+        tokens = runs["prompt_tokens"].sum() + runs["completion_tokens"].sum()
+        stats.append(
+            {
+                "model": model,
+                "Runs": len(runs),
+                "Rows": runs["rows"].sum(),
+                "Requests": runs["requests"].sum(),
+                "Errors": runs["errors"].sum(),
+                "Retries": runs["retries"].sum(),
+                "Rows/s": runs["rows"].sum() / duration if duration else 0.0,
+                "Tokens/s": tokens / duration if duration else 0.0,
+                "p50": histogram_percentile(latency_counts, 50),
+                "p95": histogram_percentile(latency_counts, 95),
+                "p99": histogram_percentile(latency_counts, 99),
+            }
+        )
+    return pd.DataFrame(stats).set_index("model") if stats else pd.DataFrame()
+
+
+class ModelRunMetrics:
+    """Model API metrics for one classification run.
+
+    record() is called once per mention request (after its retries) and
+    queues a model_requests row; finish() stores the run's totals,
+    throughput and latency histogram in model_runs."""
+
+    def __init__(self, provider, model):
+        self.provider = provider
+        self.model = model
+        self.start_time = time.time()
+        self.duration = 0.0
+        self.rows = 0
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency_sum = 0.0
+        self.latency_counts = np.zeros(len(LATENCY_BIN_EDGES) + 1, dtype=np.int64)
+
+    def record(
+        self, status, latency, attempts, http_status, rate_limited, prompt_tokens, completion_tokens
+    ) -> None:
+        self.requests += 1
+        self.errors += status != "success"
+        self.retries += attempts - 1
+        self.rate_limited += rate_limited
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.latency_sum += latency
+        self.latency_counts[np.searchsorted(LATENCY_BIN_EDGES, latency)] += 1
+        self.export_request(status, latency, attempts, rate_limited, prompt_tokens, completion_tokens)
+        metrics_logger.log(
+            {
+                "kind": "model_request",
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "provider": self.provider,
+                "model": self.model,
+                "status": status,
+                "http_status": http_status,
+                "attempts": attempts,
+                "rate_limited": rate_limited,
+                "latency": latency,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+            }
+        )
+
+    def export_request(
+        self, status, latency, attempts, rate_limited, prompt_tokens, completion_tokens
+    ) -> None:
+        labels = {"provider": self.provider, "model": self.model}
+        metrics_exporter.inc("sa_model_requests_total", status=status, **labels)
+        metrics_exporter.observe("sa_model_request_duration_seconds", latency, **labels)
+        if status == "success":
+            metrics_exporter.inc("sa_rows_processed_total", **labels)
+        if attempts > 1:
+            metrics_exporter.inc("sa_model_retries_total", attempts - 1, **labels)
+        if rate_limited:
+            metrics_exporter.inc("sa_model_rate_limited_total", rate_limited, **labels)
+        metrics_exporter.inc("sa_model_tokens_total", prompt_tokens, type="prompt", **labels)
+        metrics_exporter.inc("sa_model_tokens_total", completion_tokens, type="completion", **labels)
+
+    def set_queue_depth(self, in_flight, pending) -> None:
+        labels = {"provider": self.provider, "model": self.model}
+        metrics_exporter.set("sa_model_requests_in_flight", in_flight, **labels)
+        metrics_exporter.set("sa_model_rows_pending", pending, **labels)
+
+    def finish(self, rows) -> None:
+        self.rows = rows
+        self.duration = time.time() - self.start_time
+        duration = self.duration or 1e-9
+        labels = {"provider": self.provider, "model": self.model}
+        metrics_exporter.set("sa_run_rows_per_second", rows / duration, **labels)
+        metrics_exporter.set(
+            "sa_run_tokens_per_second", (self.prompt_tokens + self.completion_tokens) / duration, **labels
+        )
+        metrics_exporter.set("sa_run_last_completed_timestamp_seconds", time.time(), **labels)
+        metrics_exporter.flush()
+        metrics_logger.log(
+            {
+                "kind": "model_run",
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "provider": self.provider,
+                "model": self.model,
+                "rows": rows,
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "duration": self.duration,
+                "latency_sum": self.latency_sum,
+                "latency_histogram": json.dumps(self.latency_counts.tolist()),
+            }
+        )
+
+    def describe(self) -> str:
+        duration = self.duration or 1e-9
+        tokens = self.prompt_tokens + self.completion_tokens
+        latency_counts = pd.Series(self.latency_counts)
+        return (
+            f"Model API: {self.requests} requests ({self.errors} errors, {self.retries} retries) in {self.duration:.1f}s - "
+            f"{self.rows / duration:.1f} rows/s, {tokens / duration:.0f} tokens/s, "
+            f"latency p50={histogram_percentile(latency_counts, 50):.2f}s "
+            f"p95={histogram_percentile(latency_counts, 95):.2f}s "
+            f"p99={histogram_percentile(latency_counts, 99):.2f}s"
+        )
+
+
+def rollup_stats(rollups: pd.DataFrame) -> pd.DataFrame:
+    """Requests, success rate, mean and p95 response time per bucket."""
+    stats = []
+    for bucket, group in rollups.groupby("bucket"):
+        requests = group["requests"].sum()
+        stats.append(
+            {
+                "bucket": bucket,
+                "Requests": requests,
+                "Success Rate %": round(group.loc[group["status"] == "success", "requests"].sum() / requests * 100, 2),
+                "Avg Response Time": group["response_time_sum"].sum() / requests,
+                "p95": histogram_percentile(group.groupby("latency_bin")["requests"].sum(), 95),
+            }
+        )
+    return pd.DataFrame(stats, columns=["bucket", "Requests", "Success Rate %", "Avg Response Time", "p95"]).set_index("bucket")
+
+
+def histogram_percentile(counts: pd.Series, percentile) -> float:
+    """Percentile from latency bin counts (bin -> count), interpolated
+    linearly within the bin it falls in."""
+    if counts.empty or counts.sum() == 0:
+        return 0.0
+    counts = counts.sort_index()
+    cumulative = counts.cumsum().to_numpy()
+    target = cumulative[-1] * percentile / 100
+    i = int(np.searchsorted(cumulative, target))
+    latency_bin = int(counts.index[i])
+    low = LATENCY_BIN_EDGES[latency_bin - 1] if latency_bin > 0 else 0.0
+    high = LATENCY_BIN_EDGES[min(latency_bin, len(LATENCY_BIN_EDGES) - 1)]
+    before = cumulative[i - 1] if i > 0 else 0
+    fraction = (target - before) / (cumulative[i] - before)
+    return float(low + (high - low) * fraction)
+
+
+metrics_logger = MetricsLogger()
+
 
 def log_api_response(
     status,
     http_response_time,
     total_response_time,   
     response_code=None,
-    data=None,
+    batch_size=0,
     error=None,
     log_dir="api_response_logs",
 ):
-    try:
-        if getattr(sys, "frozen", False):
-            # Running as compiled exe
-            base_dir = os.path.dirname(sys.executable)
-        else:
-            # Running as script
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-
-        log_dir = os.path.join(base_dir, "api_response_logs")
-        os.makedirs(log_dir, exist_ok=True)
-
-        log_file = os.path.join(
-            log_dir, f"bw_api_metrics_{datetime.now().strftime('%Y_%m')}.csv"
-        )
+    response_data = {
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "status": status,
+        "http_response_time": http_response_time,
+        "total_response_time": total_response_time,
+        "response_code": response_code,
+        "batch_size": batch_size,
+        "error_type": type(error).__name__ if error else None,
+        "error_message": str(error) if error else None,
+    }
 
-        response_data = {
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "status": status,
-            "http_response_time": http_response_time,
-            "total_response_time": total_response_time,
-            "response_code": response_code,
-            "batch_size": len(json.loads(data)) if data else 0,
-            "error_type": type(error).__name__ if error else None,
-            "error_message": str(error) if error else None,
-        }
+    # Written to file by the background logger
+    metrics_logger.log(response_data)
 
-        # Log to file
-        df = pd.DataFrame([response_data])
-        if os.path.exists(log_file):
-            df.to_csv(log_file, mode="a", header=False, index=False)
-        else:
-            df.to_csv(log_file, index=False)
-
-    except Exception as e:
-        print(f"Error logging API response: {e}")
+    metrics_exporter.inc("sa_bw_requests_total", status=status)
+    metrics_exporter.observe("sa_bw_request_duration_seconds", total_response_time)
+    if response_code == 429:
+        metrics_exporter.inc("sa_bw_rate_limited_total")
 
-    return response_data
\ No newline at end of file
+    return response_data
@@ -0,0 +1,164 @@
+import atexit
+import os
+import threading
+import time
+from bisect import bisect_left
+
+TEXTFILE_NAME = "sentiment_analysis.prom"
+# Point this at node_exporter's --collector.textfile.directory
+TEXTFILE_DIR_ENV = "SA_METRICS_TEXTFILE_DIR"
+WRITE_INTERVAL = 15.0  # seconds between textfile updates during a run
+
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# name -> (type, help)
+METRICS = {
+    "sa_rows_processed_total": ("counter", "Mentions classified successfully."),
+    "sa_model_requests_total": ("counter", "Model API requests by final status (after retries)."),
+    "sa_model_retries_total": ("counter", "Model API request retries."),
+    "sa_model_rate_limited_total": ("counter", "Model API responses with HTTP 429."),
+    "sa_model_tokens_total": ("counter", "Model API tokens used."),
+    "sa_model_request_duration_seconds": ("histogram", "Model API request latency, including retries."),
+    "sa_model_requests_in_flight": ("gauge", "Model API requests currently running."),
+    "sa_model_rows_pending": ("gauge", "Mentions in the current classification pass still waiting for a result."),
+    "sa_run_rows_per_second": ("gauge", "Throughput of the last completed classification run."),
+    "sa_run_tokens_per_second": ("gauge", "Token throughput of the last completed classification run."),
+    "sa_run_last_completed_timestamp_seconds": ("gauge", "Unix time the last classification run finished."),
+    "sa_bw_requests_total": ("counter", "Brandwatch API requests by status."),
+    "sa_bw_retries_total": ("counter", "Brandwatch chunks queued again after a failed request."),
+    "sa_bw_rate_limited_total": ("counter", "Brandwatch API responses with HTTP 429."),
+    "sa_bw_request_duration_seconds": ("histogram", "Brandwatch API request latency."),
+    "sa_bw_mentions_uploaded_total": ("counter", "Mentions updated in Brandwatch."),
+    "sa_bw_mentions_skipped_total": ("counter", "Mentions not sent again because the upload journal or diff mode already covers them."),
+    "sa_bw_queue_depth": ("gauge", "Mentions waiting to be sent to Brandwatch."),
+    "sa_bw_requests_in_flight": ("gauge", "Brandwatch API requests currently running."),
+}
+
+
+def get_textfile_path():
+    """None unless TEXTFILE_DIR_ENV is set: a default in the shared app folder
+    would have every machine overwriting the same textfile."""
+    textfile_dir = os.environ.get(TEXTFILE_DIR_ENV)
+    if not textfile_dir:
+        return None
+    return os.path.join(textfile_dir, TEXTFILE_NAME)
+
+
+class MetricsExporter:
+    """Counters, gauges and histograms for runs and API calls, kept in a
+    Prometheus/OpenMetrics textfile for node_exporter's textfile collector.
+
+    Updates only touch memory; a background thread rewrites the file at most
+    every WRITE_INTERVAL seconds while values change, and flush() writes it
+    straight away (end of a run, exit). Values count from app start.
+    Nothing is written unless a path is given or TEXTFILE_DIR_ENV is set."""
+
+    def __init__(self, path=None, write_interval=WRITE_INTERVAL):
+        self.path = path
+        self.write_interval = write_interval
+        self.samples = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts..., sum]
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()  # flush() can run on any thread
+        self.changed = threading.Event()
+        self.thread = None
+
+    def inc(self, name, amount=1, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.samples[key] = self.samples.get(key, 0) + amount
+        self.mark_changed()
+
+    def set(self, name, value, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.samples[key] = value
+        self.mark_changed()
+
+    def observe(self, name, value, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.setdefault(key, [0] * (len(DURATION_BUCKETS) + 1) + [0.0])
+            histogram[bisect_left(DURATION_BUCKETS, value)] += 1
+            histogram[-1] += value
+        self.mark_changed()
+
+    def mark_changed(self) -> None:
+        self.changed.set()
+        if self.thread is not None:
+            return
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+                atexit.register(self.flush)
+
+    def run(self) -> None:
+        while True:
+            self.changed.wait()
+            time.sleep(self.write_interval)  # let more updates collect
+            self.changed.clear()
+            self.write()
+
+    def flush(self) -> None:
+        if self.thread is not None:
+            self.write()
+
+    def write(self) -> None:
+        path = self.path or get_textfile_path()
+        if path is None:
+            return
+        with self.write_lock:
+            with self.lock:
+                text = self.render()
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # node_exporter must never read a half-written file
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                with open(temp_path, "w", encoding="utf-8", newline="\n") as f:
+                    f.write(text)
+                os.replace(temp_path, path)
+            except Exception as e:
+                print(f"Error writing metrics textfile {path}: {e}")
+
+    def render(self) -> str:
+        lines = []
+        for name, (metric_type, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            if metric_type == "histogram":
+                for (sample_name, labels), histogram in sorted(self.histograms.items()):
+                    if sample_name != name:
+                        continue
+                    cumulative = 0
+                    for le, count in zip((*DURATION_BUCKETS, "+Inf"), histogram[:-1]):
+                        cumulative += count
+                        bucket_labels = labels + (("le", str(le)),)
+                        lines.append(f"{name}_bucket{format_labels(bucket_labels)} {cumulative}")
+                    lines.append(f"{name}_sum{format_labels(labels)} {format_value(histogram[-1])}")
+                    lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+            else:
+                for (sample_name, labels), value in sorted(self.samples.items()):
+                    if sample_name == name:
+                        lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        lines.append("")
+        return "\n".join(lines)
+
+
+def format_labels(labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def format_value(value) -> str:
+    if isinstance(value, float):
+        return repr(float(value))
+    return str(int(value))
+
+
+metrics_exporter = MetricsExporter()
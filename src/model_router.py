@@ -9,41 +9,58 @@ GEMINI_API_ENDPOINT = (
 DEEPSEEK_API_ENDPOINT = "https://api.deepseek.com/chat/completions"
 
 # Model-specific adapters
-def create_openai_payload(config, system_prompt: str, tweet: str) -> dict:
-    return {
+# max_tokens overrides config.max_tokens; json_response asks for a JSON object
+# (without logprobs) for combined company requests
+def create_openai_payload(
+    config, system_prompt: str, tweet: str, max_tokens: Optional[int] = None, json_response: bool = False
+) -> dict:
+    payload = {
         "model": config.model_name,
         "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": f'{config.user_prompt} "{tweet}"\n{config.user_prompt2}'},
         ],
         "temperature": config.temperature,
-        "max_completion_tokens": config.max_tokens,
-        "logprobs": config.output_probabilities,
+        "max_completion_tokens": max_tokens or config.max_tokens,
+        "logprobs": config.output_probabilities and not json_response,
         "store": True,
     }
+    if json_response:
+        payload["response_format"] = {"type": "json_object"}
+    return payload
 
-def create_gemini_payload(config, system_prompt: str, tweet: str) -> dict:
-    return {
+def create_gemini_payload(
+    config, system_prompt: str, tweet: str, max_tokens: Optional[int] = None, json_response: bool = False
+) -> dict:
+    payload = {
         "systemInstruction": {"parts": [{"text": system_prompt}]},
         "contents": [{"parts": [{"text": f'{config.user_prompt} "{tweet}"\n{config.user_prompt2}'}]}],
         "generationConfig": {
             "temperature": config.temperature,
-            "maxOutputTokens": config.max_tokens,
-            "responseLogprobs": config.output_probabilities,
+            "maxOutputTokens": max_tokens or config.max_tokens,
+            "responseLogprobs": config.output_probabilities and not json_response,
         },
     }
+    if json_response:
+        payload["generationConfig"]["responseMimeType"] = "application/json"
+    return payload
 
-def create_deepseek_payload(config, system_prompt: str, tweet: str) -> dict:
-    return {
+def create_deepseek_payload(
+    config, system_prompt: str, tweet: str, max_tokens: Optional[int] = None, json_response: bool = False
+) -> dict:
+    payload = {
         "model": config.model_name,
         "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": f'{config.user_prompt} "{tweet}"\n{config.user_prompt2}'},
         ],
         "temperature": config.temperature,
-        "max_tokens": config.max_tokens + 1, # "Neutral" requires 2 tokens
-        "logprobs": config.output_probabilities,
+        "max_tokens": max_tokens or config.max_tokens + 1, # "Neutral" requires 2 tokens
+        "logprobs": config.output_probabilities and not json_response,
     }
+    if json_response:
+        payload["response_format"] = {"type": "json_object"}
+    return payload
 
 def parse_openai_response(response_json: dict) -> Tuple[str, Optional[float]]:
     sentiment = response_json["choices"][0]["message"]["content"].strip()
@@ -67,13 +84,24 @@ def parse_deepseek_response(response_json: dict) -> Tuple[str, Optional[float]]:
         logprob = logprobs["content"][0]["logprob"]
     return sentiment, logprob
 
+def parse_openai_usage(response_json: dict) -> Tuple[int, int]:
+    # DeepSeek uses the same usage fields
+    usage = response_json.get("usage") or {}
+    return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+def parse_gemini_usage(response_json: dict) -> Tuple[int, int]:
+    usage = response_json.get("usageMetadata") or {}
+    return usage.get("promptTokenCount", 0), usage.get("candidatesTokenCount", 0)
+
 # Model configuration factory
 def get_model_config(model_name: str) -> dict:
     if model_name.startswith("gpt"):
         return {
+            "provider": "openai",
             "api_endpoint": OPENAI_API_ENDPOINT,
             "create_payload": create_openai_payload,
             "parse_response": parse_openai_response,
+            "parse_usage": parse_openai_usage,
             "headers": {
                 "Authorization": f"Bearer {OPENAI_API_KEY}",
                 "Content-Type": "application/json"
@@ -82,17 +110,21 @@ def get_model_config(model_name: str) -> dict:
         }
     elif model_name.startswith("gemini"):
         return {
+            "provider": "gemini",
             "api_endpoint": GEMINI_API_ENDPOINT.format(model=model_name),
             "create_payload": create_gemini_payload,
             "parse_response": parse_gemini_response,
+            "parse_usage": parse_gemini_usage,
             "headers": {"Content-Type": "application/json"},
             "params": {"key": GEMINI_API_KEY}
         }
     elif model_name.startswith("deepseek"):
         return {
+            "provider": "deepseek",
             "api_endpoint": DEEPSEEK_API_ENDPOINT,
             "create_payload": create_deepseek_payload,
             "parse_response": parse_deepseek_response,
+            "parse_usage": parse_openai_usage,
             "headers": {
                 "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
                 "Content-Type": "application/json",
@@ -1,6 +1,22 @@
+import re
+from bisect import bisect_right
+
+import numpy as np
 import pandas as pd
 from tkinter import messagebox
 
+from . import file_operations
+
+
+# Company context windows (see focus_company_context)
+CONTEXT_MIN_TEXT_CHARS = 1000  # shorter mentions are always sent whole
+CONTEXT_CHARS = 400  # most characters kept on each side of a company mention
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
+
+# Company pairs column holding the mention's row position in df (private
+# name, so it can't clash with a column of the export)
+MENTION_ROW_COLUMN = "_MentionRow"
+
 
 def setup_multi_company(df, company_column, multi_company_entry, log_message):
     if not company_column:
@@ -30,16 +46,21 @@ def create_company_column(df, company_column, multi_company_entry):
             f"Neither the specified company column '{company_column}' nor the alternative format columns were found in the input file."
         )
 
-    company_mentions = []
-    for _, row in df.iterrows():
-        mentioned_companies = [
-            col[len(company_column)+3:]
-            for col in company_columns
-            if row[col] == "X" and col[len(company_column)+3:] in companies
-        ]
-        company_mentions.append(",".join(mentioned_companies))
+    # Rows x company columns membership matrix. Each distinct combination of
+    # companies is joined once and mapped back to its rows.
+    names = np.array([col[len(company_column)+3:] for col in company_columns], dtype=object)
+    mentioned = (df[company_columns] == "X").to_numpy(dtype=bool)
+    packed = np.ascontiguousarray(np.packbits(mentioned, axis=1))
+    width = packed.shape[1]
+    combinations, inverse = np.unique(
+        packed.view(np.dtype((np.void, width))).ravel(), return_inverse=True
+    )
+    combination_rows = np.unpackbits(
+        combinations.view(np.uint8).reshape(len(combinations), width), axis=1, count=len(names)
+    ).astype(bool)
+    joined = np.array([",".join(names[row]) for row in combination_rows], dtype=object)
 
-    return pd.Series(company_mentions)
+    return pd.Series(joined[inverse.ravel()])
 
 
 def process_multi_company(
@@ -53,13 +74,12 @@ def process_multi_company(
         company.strip() for company in multi_company_entry.split(",") if company.strip()
     ]
 
-    # Check if all priority companies are present in the dataset
-    companies_in_data = set()
-    for companies in df[company_column].dropna():
-        companies_in_data.update(company.strip() for company in companies.split(","))
+    indptr, indices = build_company_index(df[company_column], company_list)
 
+    # Check if all priority companies are present in the dataset
+    mention_counts = np.bincount(indices, minlength=len(company_list))
     missing_companies = [
-        company for company in company_list if company not in companies_in_data
+        company for company, count in zip(company_list, mention_counts) if count == 0
     ]
 
     if missing_companies:
@@ -69,116 +89,249 @@ def process_multi_company(
         if not proceed:
             return None
 
-    # Always create the AnalyzedCompany column
-    df["AnalyzedCompany"] = ""
+    # Each mention is analyzed towards its highest priority company, which
+    # is the first one in its row of the index
+    has_company = np.diff(indptr) > 0
+    analyzed = np.full(len(df), len(company_list), dtype=np.intp)
+    analyzed[has_company] = indices[indptr[:-1][has_company]]
+    names = np.array(company_list + [""], dtype=object)
+    df["AnalyzedCompany"] = pd.Categorical(names[analyzed])
 
     if not separate_company_analysis:
         log_message("Creating multi-company designations based on specified order...")
-        # Existing logic for single analysis per mention
-        total_analyzed = 0
-        for priority_company in company_list:
-            mask = (df["AnalyzedCompany"] == "") & (
-                df[company_column].apply(
-                    lambda x: (
-                        priority_company
-                        in {company.strip() for company in x.split(",")}
-                        if pd.notna(x)
-                        else False
-                    )
-                )
-            )
-            company_count = mask.sum()
-            df.loc[mask, "AnalyzedCompany"] = priority_company
-            total_analyzed += company_count
+        company_counts = np.bincount(analyzed, minlength=len(company_list) + 1)
+        for priority_company, company_count in zip(company_list, company_counts):
             log_message(
                 f"{company_count} mentions will be analyzed towards {priority_company}"
             )
 
-        unanalyzed_count = len(df) - total_analyzed
+        unanalyzed_count = len(df) - int(has_company.sum())
         log_message(
             f"{unanalyzed_count} mentions will be analyzed without a specific company focus."
         )
+        return df, None
+
+    log_message("Expanding dataset for separate company analysis...")
+    company_pairs = get_company_pairs(df, indptr, indices, company_list)
+    log_message(
+        f"Expanded dataset from {len(df)} to {len(company_pairs)} rows for separate company analysis."
+    )
+
+    # Count mentions per company
+    company_counts = company_pairs["AnalyzedCompany"].value_counts()
+    for company, count in company_counts.items():
+        if company:
+            log_message(f"{count} mentions will be analyzed towards {company}")
+    unanalyzed_count = company_counts.get("", 0)
+    log_message(
+        f"{unanalyzed_count} mentions will be analyzed without a specific company focus."
+    )
+
+    return df, company_pairs
+
+
+def get_company_pairs(df, indptr, indices, company_list):
+    # Narrow table with one row per (mention, priority company) pair - or one
+    # without a company for mentions that name none - for separate analysis.
+    # MENTION_ROW_COLUMN is the mention's row position in df; results are stored here and
+    # merged back by merge_separate_company_results, so wide rows are never
+    # copied.
+    row_counts = np.maximum(np.diff(indptr), 1)
+    rows = np.repeat(np.arange(len(df)), row_counts)
+    company_ids = np.full(len(rows), len(company_list), dtype=np.intp)
+    company_ids[np.repeat(np.diff(indptr) > 0, row_counts)] = indices
+
+    names = np.array(company_list + [""], dtype=object)
+    company_pairs = pd.DataFrame(
+        {MENTION_ROW_COLUMN: rows, "AnalyzedCompany": pd.Categorical(names[company_ids])}
+    )
+    if "Full Text" in df.columns:
+        # Dictionary-encoded: each mention's text is stored once and pairs
+        # hold a code into it, so the text isn't copied per company
+        codes, texts = pd.factorize(df["Full Text"])
+        company_pairs["Full Text"] = pd.Categorical.from_codes(codes[rows], categories=texts)
+    for column in ["Sentiment", "Probs"]:
+        if column in df.columns:
+            company_pairs[column] = df[column].take(rows).reset_index(drop=True)
+    return company_pairs
+
+
+def build_company_index(companies, company_list):
+    # Sparse row x company membership of a comma-separated company column, in
+    # CSR form: the company_list positions mentioned in row i (in priority
+    # order) are indices[indptr[i]:indptr[i + 1]]. Each distinct company
+    # string is only split once.
+    positions = {}
+    for position, company in enumerate(company_list):
+        positions.setdefault(company, []).append(position)
+
+    codes, uniques = pd.factorize(companies)
+    unique_positions = [
+        sorted(
+            position
+            for company in {company.strip() for company in value.split(",")}
+            for position in positions.get(company, ())
+        )
+        for value in uniques
+    ]
+    # One extra empty entry for missing values (code -1)
+    unique_counts = np.array([len(p) for p in unique_positions] + [0], dtype=np.intp)
+    unique_starts = np.concatenate([[0], np.cumsum(unique_counts)[:-1]])
+    flat_positions = np.array(
+        [position for p in unique_positions for position in p], dtype=np.intp
+    )
+
+    row_counts = unique_counts[codes]
+    indptr = np.concatenate([[0], np.cumsum(row_counts)])
+    offsets = np.arange(indptr[-1]) - np.repeat(indptr[:-1], row_counts)
+    indices = flat_positions[np.repeat(unique_starts[codes], row_counts) + offsets]
+    return indptr, indices
+
+
+def merge_separate_company_results(df, company_pairs, bw_upload=False):
+    # Write the results of each mention's company pairs back to its row. The
+    # first pair (highest priority company) gives the mention's Sentiment;
+    # all of them are listed as "[Sentiment] toward [company]".
+    first_pairs = company_pairs[~company_pairs[MENTION_ROW_COLUMN].duplicated().to_numpy()]
+    rows = first_pairs[MENTION_ROW_COLUMN].to_numpy()
+    tags = join_company_sentiments(company_pairs, len(df), "," if bw_upload else " | ")[rows]
+
+    # Mentions whose pairs were dropped as invalid are dropped too
+    result_df = df.iloc[rows].copy()
+    file_operations.set_labels(
+        result_df, "Sentiment", result_df.index, first_pairs["Sentiment"].to_numpy()
+    )
+    if "Probs" in first_pairs.columns:
+        result_df["Probs"] = first_pairs["Probs"].to_numpy()
+    if bw_upload:
+        # Create tags for Brandwatch upload
+        result_df["BW_Tags"] = tags
     else:
-        log_message("Expanding dataset for separate company analysis...")
-        initial_row_count = len(df)
-        expanded_df = []
-
-        for original_index, row in df.iterrows():
-            companies = (
-                set(company.strip() for company in row[company_column].split(","))
-                if pd.notna(row[company_column])
-                else set()
+        # Create a combined sentiment column
+        result_df["Combined_Sentiment"] = tags
+
+    result_df.index.name = "OriginalIndex"
+    result_df.sort_index(inplace=True)  # Sort by the original index
+    return result_df
+
+
+def join_company_sentiments(company_pairs, row_count, separator):
+    # "[Sentiment] toward [company]" for each pair with a company, joined per
+    # row position. Strings are built one pair position at a time (first
+    # company of every mention, then the second, ...), so the loop only runs
+    # as often as the most companies a mention has.
+    companies = company_pairs["AnalyzedCompany"].astype(str).to_numpy(dtype=object)
+    tagged = companies != ""
+    tags = (
+        company_pairs["Sentiment"].astype(str).to_numpy(dtype=object)[tagged]
+        + " toward "
+        + companies[tagged]
+    )
+    tag_rows = company_pairs[MENTION_ROW_COLUMN].to_numpy()[tagged]
+    positions = pd.Series(tag_rows).groupby(tag_rows).cumcount().to_numpy()
+
+    joined = np.full(row_count, "", dtype=object)
+    for position in range(positions.max() + 1 if len(positions) else 0):
+        at = positions == position
+        if position == 0:
+            joined[tag_rows[at]] = tags[at]
+        else:
+            joined[tag_rows[at]] = joined[tag_rows[at]] + separator + tags[at]
+    return joined
+
+
+def parse_company_aliases(company_aliases):
+    # "Meta: Facebook, Instagram; Google: Alphabet" (or one company per line)
+    # -> {"Meta": ["Facebook", "Instagram"], "Google": ["Alphabet"]}
+    aliases = {}
+    for entry in re.split(r"[;\n]", company_aliases or ""):
+        company, _, names = entry.partition(":")
+        if company.strip() and names.strip():
+            aliases.setdefault(company.strip(), []).extend(
+                name.strip() for name in names.split(",") if name.strip()
             )
-            relevant_companies = [
-                company for company in company_list if company in companies
-            ]
-
-            if relevant_companies:
-                row["AnalyzedCompany"] = relevant_companies[0]
-                row["OriginalIndex"] = original_index  # Add original index
-                expanded_df.append(row)
-                for company in relevant_companies[1:]:
-                    new_row = row.copy()
-                    new_row["AnalyzedCompany"] = company
-                    new_row["OriginalIndex"] = original_index
-                    expanded_df.append(new_row)
-            else:
-                row["OriginalIndex"] = original_index  # Add original index
-                expanded_df.append(row)
-
-        df = pd.DataFrame(expanded_df)
-        df.reset_index(
-            drop=True, inplace=True
-        )  # Reset the index to ensure unique indices
-        log_message(
-            f"Expanded dataset from {initial_row_count} to {len(df)} rows for separate company analysis."
-        )
+    return aliases
 
-        # Count mentions per company
-        company_counts = df["AnalyzedCompany"].value_counts()
-        for company, count in company_counts.items():
-            if company:
-                log_message(f"{count} mentions will be analyzed towards {company}")
-        unanalyzed_count = company_counts.get("", 0)
+
+def focus_company_context(config, df, log_message):
+    # Replace long mentions' Full Text (in the working frame only) with the
+    # sentences around each mention of the analyzed company or its aliases,
+    # so fewer tokens are sent per request. Mentions that never name the
+    # company are left whole.
+    texts = df["Full Text"]
+    long_text = texts.str.len().gt(CONTEXT_MIN_TEXT_CHARS).fillna(False).to_numpy(dtype=bool)
+    companies = df["AnalyzedCompany"].astype(str).to_numpy(dtype=object)
+    if config.combined_company_requests and MENTION_ROW_COLUMN in df.columns:
+        # Combined requests send one text for all of a mention's companies
+        row_companies = pd.Series(companies).groupby(df[MENTION_ROW_COLUMN].to_numpy()).agg(tuple)
+        mention_companies = row_companies.reindex(df[MENTION_ROW_COLUMN].to_numpy()).to_numpy()
+    else:
+        mention_companies = [(company,) for company in companies]
+
+    aliases = parse_company_aliases(config.company_aliases)
+    patterns = {}
+    focused = texts.to_numpy(dtype=object).copy()
+    original_chars = focused_chars = 0
+    for i in np.flatnonzero(long_text):
+        names = tuple(company for company in mention_companies[i] if company)
+        if not names:
+            continue
+        if names not in patterns:
+            patterns[names] = get_company_pattern(names, aliases)
+        context = get_company_context(focused[i], patterns[names])
+        original_chars += len(focused[i])
+        focused_chars += len(context)
+        focused[i] = context
+
+    if original_chars:
+        # Same dtype as before (Arrow-backed strings for csv/arrow inputs,
+        # a categorical with each distinct text once for company pairs)
+        if isinstance(texts.dtype, pd.CategoricalDtype):
+            focused = pd.Categorical(focused)
+        else:
+            focused = pd.array(focused, dtype=texts.dtype)
+        df["Full Text"] = pd.Series(focused, index=df.index)
         log_message(
-            f"{unanalyzed_count} mentions will be analyzed without a specific company focus."
+            f"Kept only the text around each company in long mentions ({100 - focused_chars / original_chars * 100:.0f}% fewer characters sent for them)."
         )
 
-    return df
-
 
-def merge_separate_company_results(df, bw_upload=False):
-    grouped = df.groupby("OriginalIndex")
+def get_company_pattern(companies, aliases):
+    names = sorted(
+        {name for company in companies for name in [company, *aliases.get(company, [])]},
+        key=len,
+        reverse=True,  # longest first, so "Meta Platforms" wins over "Meta"
+    )
+    return re.compile(
+        r"(?<!\w)(?:" + "|".join(re.escape(name) for name in names) + r")(?!\w)",
+        re.IGNORECASE,
+    )
 
-    merged_rows = []
-    for _, group in grouped:
-        merged_row = group.iloc[0].copy()  # Take the first row as the base
 
-        primary_sentiment = merged_row["Sentiment"]
-        primary_company = merged_row["AnalyzedCompany"]
+def get_company_context(text, pattern):
+    # The sentence around each match plus its neighbours, clipped to
+    # CONTEXT_CHARS on each side; overlapping windows are merged and gaps
+    # marked with "..."
+    matches = [match.span() for match in pattern.finditer(text)]
+    if not matches:
+        return text
+    breaks = list(SENTENCE_BREAK.finditer(text))
+    sentence_starts = [0] + [match.end() for match in breaks]
+    sentence_ends = [match.start() for match in breaks] + [len(text)]
 
-        if bw_upload:
-            # Create tags for Brandwatch upload
-            tags = [
-                f"{row['Sentiment']} toward {row['AnalyzedCompany']}"
-                for _, row in group.iterrows()
-                if row["AnalyzedCompany"]
-            ]
-            merged_row["BW_Tags"] = ",".join(tags)
+    windows = []
+    for start, end in matches:
+        sentence = bisect_right(sentence_starts, start) - 1
+        window_start = max(sentence_starts[max(sentence - 1, 0)], start - CONTEXT_CHARS)
+        window_end = min(sentence_ends[min(sentence + 1, len(sentence_ends) - 1)], end + CONTEXT_CHARS)
+        if windows and window_start <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], window_end)
         else:
-            # Create a combined sentiment column
-            sentiments = [
-                f"{row['Sentiment']} toward {row['AnalyzedCompany']}"
-                for _, row in group.iterrows()
-                if row["AnalyzedCompany"]
-            ]
-            merged_row["Combined_Sentiment"] = " | ".join(sentiments)
-
-        merged_row["Sentiment"] = primary_sentiment
-        merged_row["AnalyzedCompany"] = primary_company
-        merged_rows.append(merged_row)
-
-    result_df = pd.DataFrame(merged_rows)
-    result_df.set_index("OriginalIndex", inplace=True)  # Set OriginalIndex as the index
-    result_df.sort_index(inplace=True)  # Sort by the original index
-    return result_df
+            windows.append([window_start, window_end])
+
+    context = " ... ".join(text[start:end].strip() for start, end in windows)
+    if windows[0][0] > 0:
+        context = "... " + context
+    if windows[-1][1] < len(text):
+        context += " ..."
+    return context
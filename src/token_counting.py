@@ -1,9 +1,12 @@
 import asyncio
 from aiohttp import ClientSession
 
+import numpy as np
+import pandas as pd
 import tiktoken
 
 from .sa_secrets.keys import GEMINI_API_KEY
+from .multi_company_analysis import MENTION_ROW_COLUMN
 from .DS_Tokenizer.deepseek_v2_tokenizer import init_ds_tokenizer
 
 GEMINI_TOKEN_COUNT_API_ENDPOINT = "https://generativelanguage.googleapis.com/v1beta/models/{model}:countTokens"
@@ -12,60 +15,124 @@ async def calculate_token_count(config, df, log_message):
     log_message("Calculating token counts for each mention...")
     
     # Find and drop rows where 'Full Text' is not a string or is empty
-    invalid_rows = df[
-        ~df["Full Text"].apply(lambda x: isinstance(x, str) and x.strip() != "")
-    ].index
-    df.drop(invalid_rows, inplace=True)
-    
-    full_user_prompt = f'{config.user_prompt} ""\n{config.user_prompt2}'
-    
-    # Centralize system prompt creation
-    if config.customization_option == "Multi-Company":
-        longest_company_name = df["AnalyzedCompany"].max()
-        system_with_prompt = config.system_prompt.format(
-            toward_company=f" toward {longest_company_name}"
-        ) + full_user_prompt
-    else:
-        system_with_prompt = config.system_prompt + full_user_prompt
+    invalid_rows = df.index[~get_valid_text_mask(df["Full Text"])]
+    if len(invalid_rows):
+        df.drop(invalid_rows, inplace=True)
+
+    # Each distinct system prompt (one per analyzed company, or per company
+    # list of a combined request) is only counted once
+    prompt_ids, prompts = get_prompt_variants(config, df)
+    # Combined company requests send a mention's text once for all its companies
+    counted = get_counted_text_mask(config, df)
+    texts = df["Full Text"][counted].tolist()
 
     if config.model_name.startswith('gemini'):
         # gemini token counting
         async with ClientSession() as session:
-            prompt_token_count = await get_gemini_token_count(
-                config, system_with_prompt, session
-            )
+            prompt_token_counts = await asyncio.gather(*[
+                get_gemini_token_count(config, prompt, session)
+                for prompt in prompts
+            ])
 
             tasks = [
                 get_gemini_token_count(config, tweet, session)
-                for tweet in df["Full Text"]
+                for tweet in texts
             ]
             
-            token_counts = await asyncio.gather(*tasks)
-            df["Token Count"] = [count + prompt_token_count + 2 for count in token_counts]
+            text_token_counts = await asyncio.gather(*tasks)
 
     elif config.model_name.startswith('gpt'):
         # openai token counting
         gpt_tokenizer = tiktoken.encoding_for_model(config.model_name)
-        prompt_token_count = len(gpt_tokenizer.encode(system_with_prompt))
-
-        df["Token Count"] = df["Full Text"].apply(
-            lambda tweet: len(gpt_tokenizer.encode(tweet, allowed_special={"<|endoftext|>"}))
-            + prompt_token_count
-            + 2
-        )
+        prompt_token_counts = [len(gpt_tokenizer.encode(prompt)) for prompt in prompts]
+        text_token_counts = [
+            len(tokens)
+            for tokens in gpt_tokenizer.encode_batch(texts, allowed_special={"<|endoftext|>"})
+        ]
     elif config.model_name.startswith('deepseek'):
         # deepseek token counting (for when we add a deepseek model)
         ds_tokenizer = init_ds_tokenizer()
-        prompt_token_count = len(ds_tokenizer.encode(system_with_prompt))
-
-        df["Token Count"] = df["Full Text"].apply(
-            lambda tweet: len(ds_tokenizer.encode(tweet))
-            + prompt_token_count
-            + 2
+        # Prompts and texts go through the same call, so both include the
+        # tokenizer's special tokens
+        prompt_token_counts = (
+            [len(ids) for ids in ds_tokenizer(prompts)["input_ids"]] if prompts else []
+        )
+        text_token_counts = (
+            [len(ids) for ids in ds_tokenizer(texts)["input_ids"]] if texts else []
         )
     else:
         raise ValueError(f"Unsupported model: {config.model_name}")
 
+    prompt_token_count = np.asarray(prompt_token_counts, dtype=np.int64)[prompt_ids]
+
+    text_token_count = np.zeros(len(df), dtype=np.int64)
+    text_token_count[counted] = text_token_counts
+    if not counted.all():
+        # Every pair carries the count of its mention's whole request;
+        # calculate_batch_size only counts it once per batch
+        rows = df[MENTION_ROW_COLUMN].to_numpy()
+        text_token_count = (
+            pd.Series(text_token_count[counted], index=rows[counted]).reindex(rows).to_numpy()
+        )
+    df["Token Count"] = text_token_count + prompt_token_count + 2
+
+
+def get_counted_text_mask(config, df):
+    # Mentions whose text is tokenized: all of them, except the repeated
+    # (mention, company) pairs of a combined request
+    if config.combined_company_requests and MENTION_ROW_COLUMN in df.columns:
+        return ~df[MENTION_ROW_COLUMN].duplicated().to_numpy()
+    return np.ones(len(df), dtype=bool)
+
+
+def get_valid_text_mask(text):
+    # Non-string values become NaN under the .str accessor
+    try:
+        stripped_lengths = text.str.strip().str.len()
+    except AttributeError:  # column has no string values at all
+        return pd.Series(False, index=text.index)
+    return stripped_lengths.gt(0).fillna(False).astype(bool)
+
+
+def get_prompt_variants(config, df):
+    """Each distinct full prompt text (minus the mention), and for every row
+    the position of the one its request is sent with."""
+    full_user_prompt = f'{config.user_prompt} ""\n{config.user_prompt2}'
+
+    if config.customization_option != "Multi-Company":
+        return np.zeros(len(df), dtype=np.intp), [config.system_prompt + full_user_prompt]
+
+    prompt_ids, keys = pd.factorize(get_prompt_keys(config, df))
+    prompts = [
+        (
+            config.company_list_prompt.format(
+                companies=", ".join(f'"{company}"' for company in key)
+            )
+            if isinstance(key, tuple)
+            else config.system_prompt.format(toward_company=f" toward {key}" if key else "")
+        ) + full_user_prompt
+        for key in keys
+    ]
+    return prompt_ids, prompts
+
+
+def get_prompt_keys(config, df):
+    # The analyzed company of each row, or for the pairs of a combined
+    # request (see async_core_logic.get_company_request_tasks) the tuple of
+    # its mention's companies, as listed in the company_list_prompt
+    keys = df["AnalyzedCompany"].astype(str).to_numpy(dtype=object)
+    if not (config.combined_company_requests and MENTION_ROW_COLUMN in df.columns):
+        return keys
+
+    rows = df[MENTION_ROW_COLUMN].to_numpy()
+    has_company = keys != ""
+    mention_companies = pd.Series(keys[has_company]).groupby(rows[has_company]).agg(tuple)
+    mention_companies = mention_companies[mention_companies.map(len) > 1]
+    positions = mention_companies.index.get_indexer(rows)
+    combined = has_company & (positions >= 0)
+    keys[combined] = mention_companies.to_numpy()[positions[combined]]
+    return keys
+
 
 async def get_gemini_token_count(config, text, session):
     url = GEMINI_TOKEN_COUNT_API_ENDPOINT.format(model=config.model_name)
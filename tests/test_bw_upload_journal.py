@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bw_upload_journal import BWUploadJournal
+
+
+class Mentions:
+    """The parts of BWMentions the journal reads."""
+
+    def __init__(self, df):
+        self.names = ["queryId", "resourceId", "sentiment"]
+        self.columns = [
+            df["Query Id"].to_numpy(dtype=object),
+            df["Resource Id"].to_numpy(dtype=object),
+            df["Sentiment"].str.lower().to_numpy(dtype=object),
+        ]
+        self.tags = None
+
+    def column(self, name):
+        return self.columns[self.names.index(name)]
+
+
+@pytest.fixture(autouse=True)
+def local_data_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path))
+
+
+def make_results(n=30):
+    return pd.DataFrame(
+        {
+            "Query Id": [2000000000 + i % 3 for i in range(n)],
+            "Resource Id": [10**17 + i for i in range(n)],
+            "Full Text": [f"Mention {i}" if i else "" for i in range(n)],
+            "Sentiment": ["Positive", "Neutral", "Negative"] * (n // 3),
+        }
+    )
+
+
+def test_resume_from_written_output_file(tmp_path):
+    df = make_results()
+
+    # Classification run: the journal covers every row of the input
+    mentions = Mentions(df)
+    journal = BWUploadJournal(mentions.column("queryId"))
+    uploaded = journal.unacknowledged(mentions, np.arange(20))
+    journal.record(mentions, uploaded)
+
+    # The output file has lost the empty-text row
+    output_file = tmp_path / "output.csv"
+    df[df["Full Text"] != ""].to_csv(output_file, index=False)
+    output = pd.read_csv(output_file)
+
+    mentions = Mentions(output)
+    journal = BWUploadJournal(mentions.column("queryId"))
+    remaining = journal.unacknowledged(mentions, np.arange(len(output)))
+
+    assert output["Resource Id"].iloc[remaining].tolist() == df["Resource Id"].iloc[20:].tolist()
+
+
+def test_changed_sentiment_is_sent_again():
+    df = make_results()
+    mentions = Mentions(df)
+    BWUploadJournal(mentions.column("queryId")).record(mentions, np.arange(len(df)))
+
+    df.loc[:4, "Sentiment"] = "Negative"
+    mentions = Mentions(df)
+    journal = BWUploadJournal(mentions.column("queryId"))
+    remaining = journal.unacknowledged(mentions, np.arange(len(df)))
+
+    assert remaining.tolist() == [0, 1, 3, 4]
@@ -0,0 +1,71 @@
+import openpyxl
+import pandas as pd
+
+from src import file_operations
+
+RESOURCE_IDS = ["1864445208245420184", "100000000000000001"]
+
+
+def read_export(tmp_path):
+    export = tmp_path / "export.csv"
+    rows = pd.DataFrame(
+        {
+            "Query Id": ["2003456789"] * 20,
+            "Resource Id": RESOURCE_IDS * 10,
+            "Full Text": [f"Mention {i}" for i in range(20)],
+            "Sentiment": ["Positive", "Negative"] * 10,
+        }
+    )
+    rows.to_csv(export, index=False)
+    df = file_operations.read_file(str(export), lambda message: None)
+    return file_operations.compact_columns(df)
+
+
+def test_resource_ids_round_trip_through_xlsx(tmp_path):
+    output_file = tmp_path / "output.xlsx"
+    file_operations.write_file(read_export(tmp_path), str(output_file), lambda message: None)
+
+    # Written as text cells, not numbers Excel would round to 15 digits
+    sheet = openpyxl.load_workbook(output_file, read_only=True).worksheets[0]
+    cells = list(sheet.iter_rows(min_row=2, max_row=3, max_col=2, values_only=True))
+    assert [resource_id for _, resource_id in cells] == RESOURCE_IDS
+
+    df = file_operations.read_file(str(output_file), lambda message: None)
+    assert df["Resource Id"].astype(str).tolist() == RESOURCE_IDS * 10
+
+
+def test_resource_ids_round_trip_through_result_only_xlsx(tmp_path):
+    output_file = tmp_path / "results.xlsx"
+    file_operations.write_file(
+        read_export(tmp_path), str(output_file), lambda message: None, results_only=True
+    )
+
+    results = file_operations.read_result_file(str(output_file))
+    assert results["Resource Id"].tolist() == RESOURCE_IDS * 10
+
+
+def test_working_columns_read_skips_passthrough_columns(tmp_path):
+    export = pd.DataFrame(
+        {
+            "Query Id": ["2003456789"] * 20,
+            "Resource Id": RESOURCE_IDS * 10,
+            "Author": ["someone"] * 20,
+            "Full Text": [f"Mention {i}" for i in range(20)],
+            "Tech": ["Apple"] * 20,
+            "Tech - Apple": ["X"] * 20,
+            "Url": ["https://example.com"] * 20,
+        }
+    )
+    export.to_csv(tmp_path / "export.csv", index=False)
+    export.to_excel(tmp_path / "export.xlsx", index=False)
+
+    for name in ["export.csv", "export.xlsx"]:
+        df = file_operations.read_file(
+            str(tmp_path / name),
+            lambda message: None,
+            usecols=file_operations.WorkingColumns("Tech"),
+            company_column="Tech",
+        )
+        assert df.columns.tolist() == [
+            "Query Id", "Resource Id", "Full Text", "Tech", "Tech - Apple"
+        ]